@@ -2,34 +2,95 @@
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.const import Platform
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers.storage import Store
+import homeassistant.helpers.config_validation as cv
 from datetime import timedelta
 import logging
 import asyncio
 
-from .api import SwimoAPI
-from .const import DOMAIN
+from .pyswimo import SwimoAPI
+from .accumulators import parse_power_curves
+from .const import (
+    CONF_DEADBAND_SCALE,
+    CONF_FILTRATION,
+    CONF_FILTRATION_ACTION,
+    CONF_FILTRATION_CENTER,
+    CONF_FILTRATION_SENSOR,
+    CONF_MAX_CONCURRENT,
+    CONF_METRICS,
+    CONF_MQTT,
+    CONF_MQTT_PREFIX,
+    CONF_POWER_CURVES,
+    CONF_RECONNECT_DELAY,
+    CONF_SCAN_INTERVAL,
+    CONF_TIMEOUT,
+    CONF_WEBSOCKET,
+    DEFAULT_OPTIONS,
+    DOMAIN,
+    MAX_CONCURRENT_REQUESTS,
+    WEBSOCKET_START_DELAY,
+    WEBSOCKET_START_SPREAD,
+)
+from .coordinator import SwimoCoordinator
+from .scheduler import SwimoScheduler
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = [Platform.SENSOR, Platform.SWITCH, Platform.NUMBER, Platform.BINARY_SENSOR]
-SCAN_INTERVAL = timedelta(seconds=30)
+STORAGE_VERSION = 1
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+def entry_options(entry: ConfigEntry) -> dict:
+    """Options de l'entrée complétées par les valeurs par défaut."""
+    return {**DEFAULT_OPTIONS, **entry.options}
+
+def _apply_client_options(api: SwimoAPI, scheduler: SwimoScheduler, entry_id: str, options: dict):
+    """Délais et concurrence des requêtes, à appliquer avant la première interrogation."""
+    api.request_timeout = options[CONF_TIMEOUT]
+    api.set_reconnect_delay(options[CONF_RECONNECT_DELAY])
+    scheduler.set_limit(entry_id, options[CONF_MAX_CONCURRENT])
+
+async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+    """Configuration des services Swimo."""
+    await async_setup_services(hass)
+    return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Configuration de l'intégration Swimo."""
     hass.data.setdefault(DOMAIN, {})
-    api = SwimoAPI(entry.data["email"], entry.data["password"])
-    coordinator = DataUpdateCoordinator(hass, _LOGGER, name=DOMAIN, update_method=api.get_all_data, update_interval=SCAN_INTERVAL)
+    options = entry_options(entry)
+    scheduler = hass.data[DOMAIN].get("_scheduler")
+    if scheduler is None:
+        scheduler = hass.data[DOMAIN]["_scheduler"] = SwimoScheduler(MAX_CONCURRENT_REQUESTS)
+    store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.commands")
+    api = SwimoAPI(entry.data["email"], entry.data["password"], store=store)
+    # Les secondes tentatives de lecture comptent dans la limite globale de requêtes
+    api.set_hedge_limit(scheduler.limit)
+    _apply_client_options(api, scheduler, entry.entry_id, options)
+    await api.async_load_journal()
+    runtime_store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.runtime")
+    scan_interval = timedelta(seconds=options[CONF_SCAN_INTERVAL])
+    poll_offset = scheduler.poll_offset(entry.entry_id, scan_interval.total_seconds())
+    coordinator = SwimoCoordinator(
+        hass, api, update_interval=scan_interval, runtime_store=runtime_store,
+        scheduler=scheduler, poll_offset=poll_offset, deadband_scale=options[CONF_DEADBAND_SCALE],
+    )
+    await coordinator.async_load_runtime()
     await coordinator.async_config_entry_first_refresh()
     
     async def websocket_callback(data):
         _LOGGER.debug(f"WebSocket callback: {data.get('type')}")
-        await coordinator.async_request_refresh()
+        coordinator.async_update_records(api.pop_changed_records())
+    
+    websocket_delay = scheduler.start_delay(entry.entry_id, WEBSOCKET_START_DELAY, WEBSOCKET_START_SPREAD)
+    _LOGGER.debug(f"Entrée {entry.entry_id}: interrogation décalée de {poll_offset} s, WebSocket dans {websocket_delay} s")
     
-    async def start_websocket():
+    async def start_websocket(delay):
         try:
-            await asyncio.sleep(5)
-            success = await api.start_websocket(callback=websocket_callback)
+            await asyncio.sleep(delay)
+            async with scheduler.limit():
+                success = await api.start_websocket(callback=websocket_callback)
             if success:
                 _LOGGER.info("WebSocket Swimo démarré")
             else:
@@ -37,8 +98,71 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         except Exception as e:
             _LOGGER.error(f"Erreur WebSocket: {e}")
     
-    hass.async_create_task(start_websocket())
-    hass.data[DOMAIN][entry.entry_id] = {"api": api, "coordinator": coordinator}
+    entry.async_on_unload(lambda: api.unregister_callback(websocket_callback))
+    entry_data = hass.data[DOMAIN][entry.entry_id] = {
+        "api": api,
+        "coordinator": coordinator,
+        CONF_METRICS: False,
+    }
+    
+    async def apply_options(options, delay=0.0):
+        """Applique les options sans recharger l'entrée."""
+        _apply_client_options(api, scheduler, entry.entry_id, options)
+        coordinator.async_set_deadband_scale(options[CONF_DEADBAND_SCALE])
+        coordinator.set_filtration(
+            options[CONF_FILTRATION], str(options[CONF_FILTRATION_ACTION] or ""), options[CONF_FILTRATION_CENTER],
+            str(options[CONF_FILTRATION_SENSOR] or ""),
+        )
+        try:
+            curves = parse_power_curves(options[CONF_POWER_CURVES])
+        except ValueError as e:
+            _LOGGER.warning(f"Option {CONF_POWER_CURVES} ignorée: {e}")
+            curves = {}
+        coordinator.set_power_curves(curves)
+        # Les capteurs d'énergie sont créés au chargement : nouvelles actions, rechargement
+        if set(curves) != entry_data.setdefault("energy_actions", set(curves)):
+            hass.config_entries.async_schedule_reload(entry.entry_id)
+        
+        # Interrogation seule, ou interrogation et trames poussées
+        task = entry_data.get("websocket_task")
+        if options[CONF_WEBSOCKET]:
+            if (task is None or task.done()) and not api.is_websocket_connected():
+                entry_data["websocket_task"] = api.create_background_task(
+                    start_websocket(delay), name=f"swimo_websocket_{entry.entry_id}",
+                )
+        else:
+            if task is not None:
+                task.cancel()
+            await api.stop_websocket()
+            coordinator.async_update_records(api.pop_changed_records())
+        
+        bridge = entry_data.get("mqtt")
+        if bridge is not None and (not options[CONF_MQTT] or bridge.prefix != options[CONF_MQTT_PREFIX]):
+            await bridge.async_stop()
+            entry_data.pop("mqtt")
+            bridge = None
+        if options[CONF_MQTT] and bridge is None:
+            from .mqtt_bridge import SwimoMqttBridge
+            bridge = SwimoMqttBridge(hass, coordinator, options[CONF_MQTT_PREFIX], entry.entry_id)
+            entry_data["mqtt"] = bridge
+            api.create_background_task(bridge.async_start(), name=f"swimo_mqtt_{entry.entry_id}")
+        
+        entry_data[CONF_METRICS] = options[CONF_METRICS]
+        if options[CONF_METRICS] and not hass.data[DOMAIN].get("_metrics_view"):
+            from .metrics import SwimoMetricsView
+            hass.http.register_view(SwimoMetricsView())
+            hass.data[DOMAIN]["_metrics_view"] = True
+        
+        # La nouvelle période part d'une interrogation immédiate
+        if coordinator.set_interval(timedelta(seconds=options[CONF_SCAN_INTERVAL])):
+            await coordinator.async_request_refresh()
+    
+    async def options_updated(hass: HomeAssistant, entry: ConfigEntry):
+        _LOGGER.debug(f"Entrée {entry.entry_id}: options modifiées")
+        await apply_options(entry_options(entry))
+    
+    await apply_options(options, websocket_delay)
+    entry.async_on_unload(entry.add_update_listener(options_updated))
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
@@ -47,6 +171,18 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         api = hass.data[DOMAIN][entry.entry_id]["api"]
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        bridge = hass.data[DOMAIN][entry.entry_id].get("mqtt")
+        if bridge is not None:
+            await bridge.async_stop()
+        await coordinator.async_shutdown()
+        await coordinator.async_save_runtime()
         await api.close()
+        hass.data[DOMAIN]["_scheduler"].set_limit(entry.entry_id, None)
         hass.data[DOMAIN].pop(entry.entry_id)
     return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Suppression de l'intégration : purge du journal des commandes et des compteurs."""
+    await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.commands").async_remove()
+    await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.runtime").async_remove()
@@ -0,0 +1,176 @@
+# ============================================================================
+# accumulators.py - Compteurs de fonctionnement des actions
+# ============================================================================
+"""Intégration des transitions de statut des actions en compteurs.
+
+Pour chaque action : durée de fonctionnement du jour et totale, nombre de
+cycles (démarrages) et énergie consommée selon la courbe de puissance de
+la courbe de puissance configurée. Les compteurs totaux sont monotones et
+persistés.
+"""
+
+
+def parse_power_curves(text: str) -> dict:
+    """Courbes de puissance de l'option power_curves, par numéro d'action.
+
+    Format : `numéro=puissance[:fraction,fraction...]` séparés par des
+    points-virgules, par exemple `1=750:0.35,0.65,1; 4=1100`. La puissance
+    nominale est en watts, les fractions s'appliquent aux vitesses 1, 2, 3...
+    Sans fraction, la vitesse est un pourcentage (loi de similitude, cube de
+    la vitesse). Lève ValueError si le texte est invalide.
+    """
+    curves = {}
+    for item in (text or "").split(";"):
+        item = item.strip()
+        if not item:
+            continue
+        number, _, spec = item.partition("=")
+        power, _, levels = spec.partition(":")
+        number = number.strip()
+        if not number or not power.strip():
+            raise ValueError(f"Courbe de puissance invalide : {item}")
+        rated = float(power)
+        fractions = [float(fraction) for fraction in levels.split(",") if fraction.strip()]
+        if rated <= 0 or any(fraction < 0 for fraction in fractions):
+            raise ValueError(f"Courbe de puissance invalide : {item}")
+        curves[number] = {"rated_power": rated, "levels": dict(enumerate(fractions, start=1))}
+    return curves
+
+
+def power_for_speed(curve: dict, speed) -> float:
+    """Puissance (W) absorbée à une vitesse donnée."""
+    rated = curve["rated_power"]
+    try:
+        speed = int(float(speed))
+    except (ValueError, TypeError):
+        return rated
+    if speed <= 0:
+        return rated
+    levels = curve["levels"]
+    if levels:
+        # Vitesse hors des niveaux configurés : niveau le plus proche
+        nearest = speed if speed in levels else min(levels, key=lambda level: abs(level - speed))
+        return rated * levels[nearest]
+    return rated * min(speed, 100) ** 3 / 1e6
+
+
+def is_running(action) -> bool:
+    """Indique si une action est en fonctionnement."""
+    return action.status == 1
+
+
+class _Counter:
+    """Compteurs d'une action."""
+
+    __slots__ = ("running", "since", "speed", "day", "runtime_today", "runtime_total",
+                 "cycles_today", "cycles_total", "energy")
+
+    def __init__(self, day):
+        # None : état inconnu (premier relevé ou redémarrage), pas compté comme un cycle
+        self.running = None
+        self.since = None
+        self.speed = None
+        self.day = day
+        self.runtime_today = 0.0
+        self.runtime_total = 0.0
+        self.cycles_today = 0
+        self.cycles_total = 0
+        self.energy = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "day": self.day,
+            "runtime_today": self.runtime_today,
+            "runtime_total": self.runtime_total,
+            "cycles_today": self.cycles_today,
+            "cycles_total": self.cycles_total,
+            "energy": self.energy,
+        }
+
+
+class RuntimeAccumulators:
+    """Compteurs de fonctionnement et d'énergie de toutes les actions."""
+
+    def __init__(self):
+        self._counters = {}
+        self._curves = {}
+
+    def set_curves(self, curves: dict):
+        """Courbes de puissance par clé d'action : seules ces actions comptent l'énergie."""
+        self._curves = curves
+
+    def has_curve(self, key) -> bool:
+        return key in self._curves
+
+    def load(self, data: dict, day: str):
+        """Restaure les compteurs persistés (l'arrêt de Home Assistant n'est pas compté)."""
+        for key, stored in (data or {}).items():
+            counter = _Counter(stored.get("day", day))
+            counter.runtime_today = stored.get("runtime_today", 0.0)
+            counter.runtime_total = stored.get("runtime_total", 0.0)
+            counter.cycles_today = stored.get("cycles_today", 0)
+            counter.cycles_total = stored.get("cycles_total", 0)
+            counter.energy = stored.get("energy", 0.0)
+            self._counters[key] = counter
+            self._roll_day(counter, day)
+
+    def as_dict(self) -> dict:
+        """Compteurs à persister."""
+        return {key: counter.as_dict() for key, counter in self._counters.items()}
+
+    def observe(self, key, action: dict, now: float, day: str):
+        """Intègre l'état d'une action au temps `now`."""
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = _Counter(day)
+
+        self._integrate(key, counter, now, day)
+
+        running = is_running(action)
+        if running and counter.running is False:
+            counter.cycles_today += 1
+            counter.cycles_total += 1
+        counter.running = running
+        counter.speed = action.speed
+        counter.since = now
+
+    def tick(self, now: float, day: str) -> list:
+        """Intègre les actions en fonctionnement, retourne leurs clés."""
+        running = []
+        for key, counter in self._counters.items():
+            self._integrate(key, counter, now, day)
+            if counter.since is not None:
+                counter.since = now
+            if counter.running:
+                running.append(key)
+        return running
+
+    def _integrate(self, key, counter, now, day):
+        """Ajoute le temps écoulé depuis la dernière intégration."""
+        self._roll_day(counter, day)
+        if counter.running and counter.since is not None and now > counter.since:
+            elapsed = now - counter.since
+            counter.runtime_today += elapsed
+            counter.runtime_total += elapsed
+            curve = self._curves.get(key)
+            if curve:
+                counter.energy += power_for_speed(curve, counter.speed) * elapsed / 3.6e6
+
+    @staticmethod
+    def _roll_day(counter, day):
+        """Remet à zéro les compteurs du jour au changement de date."""
+        if counter.day != day:
+            counter.day = day
+            counter.runtime_today = 0.0
+            counter.cycles_today = 0
+
+    def value(self, key, metric: str):
+        """Valeur d'un compteur : runtime_today/runtime_total (h), cycles_today/cycles_total, energy (kWh)."""
+        counter = self._counters.get(key)
+        if counter is None:
+            return None
+        if metric in ("runtime_today", "runtime_total"):
+            return round(getattr(counter, metric) / 3600, 2)
+        if metric == "energy":
+            return round(counter.energy, 3)
+        return getattr(counter, metric)
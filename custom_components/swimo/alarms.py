@@ -0,0 +1,84 @@
+# ============================================================================
+# alarms.py - Évaluation locale des alarmes capteurs
+# ============================================================================
+"""Évaluation locale des seuils d'alarme des capteurs.
+
+Chaque valeur reçue (polling ou WebSocket) est comparée aux seuils
+alarm_min/alarm_max du capteur. Une alarme se déclenche dès
+le franchissement d'un seuil et ne retombe qu'une fois la valeur revenue
+au-delà d'une marge d'hystérésis, pour éviter les oscillations.
+"""
+from .const import ALARM_HYSTERESIS
+
+
+def alarm_thresholds(sensor):
+    """Retourne les seuils (min, max) d'un capteur, None pour un seuil absent."""
+    low, high = sensor.alarm_min, sensor.alarm_max
+    if low is not None and high is not None and low >= high:
+        # Seuils incohérents : alarme non configurée
+        return None, None
+    return low, high
+
+
+def has_thresholds(sensor) -> bool:
+    """Indique si un capteur porte au moins un seuil d'alarme."""
+    return alarm_thresholds(sensor) != (None, None)
+
+
+class SwimoAlarmEngine:
+    """Moteur d'alarmes locales avec hystérésis."""
+
+    def __init__(self, hysteresis: float = ALARM_HYSTERESIS):
+        self._hysteresis = hysteresis
+        self._active = {}
+
+    def is_active(self, key) -> bool:
+        """Indique si l'alarme d'un capteur est active."""
+        return key in self._active
+
+    def reason(self, key):
+        """Seuil franchi ("min" ou "max") pour une alarme active."""
+        return self._active.get(key)
+
+    def evaluate(self, key, sensor):
+        """Évalue un capteur, retourne (active, seuil) sur un front, None sinon.
+
+        Le seuil franchi est recalculé à chaque valeur : un passage direct
+        de min à max est un nouveau front (True, "max"). Une alarme active
+        retombe si les seuils disparaissent ou deviennent incohérents.
+        """
+        value = sensor.value
+        low, high = alarm_thresholds(sensor)
+        current = self._active.get(key)
+        if low is None and high is None:
+            if current is None:
+                return None
+            del self._active[key]
+            return False, current
+        if value is None:
+            return None
+
+        if low is not None and high is not None:
+            margin = self._hysteresis * (high - low)
+        else:
+            margin = self._hysteresis * abs(low if low is not None else high)
+
+        if low is not None and value < low:
+            reason = "min"
+        elif high is not None and value > high:
+            reason = "max"
+        elif current == "min" and low is not None and value < low + margin:
+            # Alarme active : retombée uniquement hors de la marge d'hystérésis
+            reason = current
+        elif current == "max" and high is not None and value > high - margin:
+            reason = current
+        else:
+            reason = None
+
+        if reason == current:
+            return None
+        if reason is None:
+            del self._active[key]
+            return False, current
+        self._active[key] = reason
+        return True, reason
@@ -6,10 +6,12 @@ from homeassistant.components.binary_sensor import BinarySensorEntity, BinarySen
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 import logging
 
+from .alarms import has_thresholds
+from .pyswimo import WEBSOCKET_KEY
 from .const import DOMAIN
+from .entity import SwimoEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,31 +30,29 @@ async def async_setup_entry(
     entities.append(SwimoWebSocketSensor(coordinator, api, entry.entry_id))
     
     # Alarmes
-    alarms = coordinator.data.get("alarms", [])
-    for alarm in alarms:
-        alarm_num = alarm.get("alarm_index") or alarm.get("alarm_number")
-        if alarm_num:
-            entities.append(SwimoAlarm(coordinator, alarm, entry.entry_id))
+    for alarm in coordinator.data.alarms.values():
+        entities.append(SwimoAlarm(coordinator, alarm, entry.entry_id))
     
-    # Capteurs d'alarme dans les sensors
-    sensors = coordinator.data.get("sensors", [])
-    for sensor in sensors:
-        if sensor.get("sensor_alarm") == "1":
+    # Capteurs d'alarme : seuils évalués localement ou alarme signalée par le cloud
+    for sensor in coordinator.data.sensors.values():
+        if sensor.alarm or has_thresholds(sensor):
             entities.append(SwimoSensorAlarm(coordinator, sensor, entry.entry_id))
     
     async_add_entities(entities)
 
 
-class SwimoWebSocketSensor(CoordinatorEntity, BinarySensorEntity):
+class SwimoWebSocketSensor(SwimoEntity, BinarySensorEntity):
     """Capteur d'état de la connexion WebSocket."""
     
     def __init__(self, coordinator, api, entry_id):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=WEBSOCKET_KEY)
         self._api = api
         self._attr_name = "Swimo Connexion Temps Réel"
         self._attr_unique_id = f"swimo_{entry_id}_websocket"
         self._attr_device_class = BinarySensorDeviceClass.CONNECTIVITY
         self._attr_icon = "mdi:wifi"
+        self._attrs = {}
+        self._attrs_connected = None
     
     @property
     def is_on(self):
@@ -61,52 +61,58 @@ class SwimoWebSocketSensor(CoordinatorEntity, BinarySensorEntity):
     
     @property
     def extra_state_attributes(self):
-        """Attributs supplémentaires."""
-        return {
-            "mode": "WebSocket temps réel" if self.is_on else "Polling HTTP",
-            "url": "wss://now.swimo.io" if self.is_on else "https://socket.swimo.io"
-        }
+        """Attributs supplémentaires, reconstruits seulement si la connexion change."""
+        connected = self.is_on
+        if connected != self._attrs_connected:
+            self._attrs = {
+                "mode": "WebSocket temps réel" if connected else "Polling HTTP",
+                "url": "wss://now.swimo.io" if connected else "https://socket.swimo.io"
+            }
+            self._attrs_connected = connected
+        return self._attrs
 
 
-class SwimoAlarm(CoordinatorEntity, BinarySensorEntity):
+class SwimoAlarm(SwimoEntity, BinarySensorEntity):
     """Capteur d'alarme."""
     
     def __init__(self, coordinator, alarm_data, entry_id):
-        super().__init__(coordinator)
-        self._alarm_data = alarm_data
-        self._alarm_num = alarm_data.get("alarm_index") or alarm_data.get("alarm_number")
+        self._record_key = alarm_data.key
+        super().__init__(coordinator, context=self._record_key)
+        self._alarm_num = alarm_data.number
         
-        self._attr_name = f"Swimo {alarm_data.get('alarm_name', f'Alarme {self._alarm_num}')}"
+        self._attr_name = f"Swimo {alarm_data.name or f'Alarme {self._alarm_num}'}"
         self._attr_unique_id = f"swimo_{entry_id}_alarm_{self._alarm_num}"
         self._attr_device_class = BinarySensorDeviceClass.PROBLEM
     
     @property
     def is_on(self):
         """État de l'alarme."""
-        alarms = self.coordinator.data.get("alarms", [])
-        for alarm in alarms:
-            alarm_num = alarm.get("alarm_index") or alarm.get("alarm_number")
-            if alarm_num == self._alarm_num:
-                return alarm.get("alarm_status", 0) == 1
-        return False
+        alarm = self.coordinator.get_record(self._record_key)
+        return bool(alarm) and alarm.status == 1
 
 
-class SwimoSensorAlarm(CoordinatorEntity, BinarySensorEntity):
+class SwimoSensorAlarm(SwimoEntity, BinarySensorEntity):
     """Alarme associée à un capteur."""
     
     def __init__(self, coordinator, sensor_data, entry_id):
-        super().__init__(coordinator)
-        self._sensor_num = sensor_data.get("sensor_number")
+        # Même clé que le capteur : l'alarme est réveillée avec lui
+        self._record_key = sensor_data.key
+        super().__init__(coordinator, context=self._record_key)
+        self._sensor_num = sensor_data.number
         
-        self._attr_name = f"Swimo {sensor_data.get('sensor_name')} Alarme"
+        self._attr_name = f"Swimo {sensor_data.name} Alarme"
         self._attr_unique_id = f"swimo_{entry_id}_sensor_alarm_{self._sensor_num}"
         self._attr_device_class = BinarySensorDeviceClass.PROBLEM
     
     @property
     def is_on(self):
-        """État de l'alarme."""
-        sensors = self.coordinator.data.get("sensors", [])
-        for sensor in sensors:
-            if sensor.get("sensor_number") == self._sensor_num:
-                return sensor.get("sensor_alarm") == "1"
-        return False
\ No newline at end of file
+        """État de l'alarme : seuils locaux ou alarme du cloud."""
+        if self.coordinator.alarms.is_active(self._record_key):
+            return True
+        sensor = self.coordinator.get_record(self._record_key)
+        return bool(sensor) and sensor.alarm
+    
+    @property
+    def extra_state_attributes(self):
+        """Seuil franchi."""
+        return {"threshold": self.coordinator.alarms.reason(self._record_key)}
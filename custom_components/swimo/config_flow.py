@@ -5,8 +5,26 @@
 from homeassistant import config_entries
 from homeassistant.core import callback
 import voluptuous as vol
-from .const import DOMAIN
-from .api import SwimoAPI
+from .const import (
+    CONF_DEADBAND_SCALE,
+    CONF_FILTRATION,
+    CONF_FILTRATION_ACTION,
+    CONF_FILTRATION_CENTER,
+    CONF_FILTRATION_SENSOR,
+    CONF_MAX_CONCURRENT,
+    CONF_METRICS,
+    CONF_MQTT,
+    CONF_MQTT_PREFIX,
+    CONF_POWER_CURVES,
+    CONF_RECONNECT_DELAY,
+    CONF_SCAN_INTERVAL,
+    CONF_TIMEOUT,
+    CONF_WEBSOCKET,
+    DEFAULT_OPTIONS,
+    DOMAIN,
+)
+from .accumulators import parse_power_curves
+from .pyswimo import SwimoAPI
 import logging
 
 _LOGGER = logging.getLogger(__name__)
@@ -16,6 +34,12 @@ class SwimoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     
     VERSION = 1
     
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Flux des options de l'entrée."""
+        return SwimoOptionsFlow()
+    
     async def async_step_user(self, user_input=None):
         """Gestion de l'étape utilisateur."""
         errors = {}
@@ -35,11 +59,8 @@ class SwimoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     data = await api.get_all_data()
                     system_name = "Piscine"
                     
-                    if data and "system" in data:
-                        sys_info = data["system"]
-                        if isinstance(sys_info, list) and len(sys_info) > 0:
-                            sys_info = sys_info[0]
-                            system_name = sys_info.get("sys_name", "Piscine").capitalize()
+                    if data.system and data.system.name:
+                        system_name = data.system.name.capitalize()
                     
                     await api.close()
                     
@@ -66,4 +87,47 @@ class SwimoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 "email": "Votre email Swimo",
                 "password": "Votre mot de passe"
             }
-        )
\ No newline at end of file
+        )
+
+
+class SwimoOptionsFlow(config_entries.OptionsFlow):
+    """Options de transport et de performance, appliquées sans rechargement."""
+    
+    async def async_step_init(self, user_input=None):
+        """Gestion de l'étape des options."""
+        errors = {}
+        if user_input is not None:
+            try:
+                parse_power_curves(user_input.get(CONF_POWER_CURVES, ""))
+            except ValueError:
+                errors[CONF_POWER_CURVES] = "invalid_power_curves"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+        
+        options = {**DEFAULT_OPTIONS, **self.config_entry.options, **(user_input or {})}
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Required(CONF_SCAN_INTERVAL, default=options[CONF_SCAN_INTERVAL]):
+                    vol.All(vol.Coerce(int), vol.Range(min=10, max=3600)),
+                vol.Required(CONF_WEBSOCKET, default=options[CONF_WEBSOCKET]): bool,
+                vol.Required(CONF_TIMEOUT, default=options[CONF_TIMEOUT]):
+                    vol.All(vol.Coerce(int), vol.Range(min=2, max=60)),
+                vol.Required(CONF_RECONNECT_DELAY, default=options[CONF_RECONNECT_DELAY]):
+                    vol.All(vol.Coerce(int), vol.Range(min=1, max=300)),
+                vol.Required(CONF_MAX_CONCURRENT, default=options[CONF_MAX_CONCURRENT]):
+                    vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+                vol.Required(CONF_DEADBAND_SCALE, default=options[CONF_DEADBAND_SCALE]):
+                    vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+                vol.Required(CONF_FILTRATION, default=options[CONF_FILTRATION]): bool,
+                vol.Optional(CONF_FILTRATION_ACTION, default=options[CONF_FILTRATION_ACTION]): str,
+                vol.Required(CONF_FILTRATION_CENTER, default=options[CONF_FILTRATION_CENTER]):
+                    vol.All(vol.Coerce(int), vol.Range(min=0, max=23)),
+                vol.Optional(CONF_FILTRATION_SENSOR, default=options[CONF_FILTRATION_SENSOR]): str,
+                vol.Optional(CONF_POWER_CURVES, default=options[CONF_POWER_CURVES]): str,
+                vol.Required(CONF_METRICS, default=options[CONF_METRICS]): bool,
+                vol.Required(CONF_MQTT, default=options[CONF_MQTT]): bool,
+                vol.Required(CONF_MQTT_PREFIX, default=options[CONF_MQTT_PREFIX]): str,
+            }),
+            errors=errors,
+        )
@@ -6,17 +6,33 @@
 DOMAIN = "swimo"
 
 # Types de capteurs
+# "key" identifie la grandeur, "hash" les fragments de sensor_hash qui la désignent
 SENSOR_TYPES = {
-    1: {"name": "pH", "unit": "pH", "icon": "mdi:ph"},
-    2: {"name": "Redox", "unit": "mV", "icon": "mdi:water-check"},
-    3: {"name": "Chlore", "unit": "mg/L", "icon": "mdi:flask"},
-    4: {"name": "Température", "unit": "°C", "icon": "mdi:thermometer"},
-    5: {"name": "Pression", "unit": "bar", "icon": "mdi:gauge"},
-    7: {"name": "Débit", "unit": "m³/h", "icon": "mdi:water-pump"},
-    8: {"name": "Conductivité", "unit": "g/L", "icon": "mdi:sine-wave"},
-    12: {"name": "Niveau d'eau", "unit": "", "icon": "mdi:waves"},
+    1: {"name": "pH", "unit": "pH", "icon": "mdi:ph", "key": "ph", "hash": ("PH",)},
+    2: {"name": "Redox", "unit": "mV", "icon": "mdi:water-check", "key": "redox", "hash": ("ORP", "REDOX")},
+    3: {"name": "Chlore", "unit": "mg/L", "icon": "mdi:flask", "key": "chlorine", "hash": ("CL",)},
+    4: {"name": "Température", "unit": "°C", "icon": "mdi:thermometer", "key": "temperature", "hash": ("TEMP",)},
+    5: {"name": "Pression", "unit": "bar", "icon": "mdi:gauge", "key": "pressure", "hash": ("PRESSURE",)},
+    7: {"name": "Débit", "unit": "m³/h", "icon": "mdi:water-pump", "key": "flow", "hash": ("FLOW",)},
+    8: {"name": "Conductivité", "unit": "g/L", "icon": "mdi:sine-wave", "key": "conductivity", "hash": ("COND", "SALT")},
+    12: {"name": "Niveau d'eau", "unit": "", "icon": "mdi:waves", "key": "level", "hash": ("TANK", "LEVEL")},
 }
 
+# Filtrage des changements non significatifs par grandeur :
+# "abs" / "rel" zone morte absolue / relative, "min_interval" délai minimal
+# entre deux écritures, "heartbeat" écriture forcée après ce silence (secondes)
+DEADBANDS = {
+    "ph": {"abs": 0.02, "rel": 0, "min_interval": 60, "heartbeat": 900},
+    "redox": {"abs": 5, "rel": 0, "min_interval": 60, "heartbeat": 900},
+    "chlorine": {"abs": 0.05, "rel": 0, "min_interval": 60, "heartbeat": 900},
+    "temperature": {"abs": 0.1, "rel": 0, "min_interval": 60, "heartbeat": 900},
+    "pressure": {"abs": 0.02, "rel": 0, "min_interval": 30, "heartbeat": 900},
+    "flow": {"abs": 0, "rel": 0.02, "min_interval": 30, "heartbeat": 900},
+    "conductivity": {"abs": 0.05, "rel": 0, "min_interval": 60, "heartbeat": 900},
+    "level": {"abs": 0, "rel": 0, "min_interval": 0, "heartbeat": None},
+}
+DEFAULT_DEADBAND = {"abs": 0, "rel": 0, "min_interval": 0, "heartbeat": None}
+
 # Types d'appareils
 DEVICE_TYPES = {
     "pump": {"name": "Pompe", "icon": "mdi:pump"},
@@ -27,7 +43,88 @@ DEVICE_TYPES = {
     "chlorine_pump": {"name": "Pompe Chlore", "icon": "mdi:flask"},
 }
 
+# Options de l'entrée
+CONF_SCAN_INTERVAL = "scan_interval"  # période d'interrogation get_all (secondes)
+CONF_WEBSOCKET = "websocket"  # trames poussées en plus de l'interrogation
+CONF_TIMEOUT = "timeout"  # délai des requêtes HTTP (secondes)
+CONF_RECONNECT_DELAY = "reconnect_delay"  # délai initial de reconnexion WebSocket (secondes)
+CONF_MAX_CONCURRENT = "max_concurrent"  # requêtes simultanées, toutes entrées confondues
+CONF_DEADBAND_SCALE = "deadband_scale"  # multiplicateur des zones mortes (0 : aucun filtrage)
+CONF_FILTRATION = "filtration"  # planification locale de la filtration
+CONF_FILTRATION_ACTION = "filtration_action"  # numéro de l'action pilotée (vide : détection)
+CONF_FILTRATION_CENTER = "filtration_center"  # heure centrale de la plage quotidienne
+CONF_FILTRATION_SENSOR = "filtration_sensor"  # numéro du capteur de température de l'eau
+CONF_POWER_CURVES = "power_curves"  # courbes de puissance des actions (compteurs d'énergie)
+CONF_METRICS = "metrics"  # export OpenMetrics sur /api/swimo/metrics
+CONF_MQTT = "mqtt"  # passerelle MQTT (broker de l'intégration mqtt)
+CONF_MQTT_PREFIX = "mqtt_prefix"
+DEFAULT_MQTT_PREFIX = DOMAIN
+DEFAULT_SCAN_INTERVAL = 30  # secondes
+REQUEST_TIMEOUT = 10  # secondes
+
 # Configuration WebSocket
 WEBSOCKET_ENABLED = True
 WEBSOCKET_RECONNECT_DELAY = 5  # secondes
+WEBSOCKET_START_DELAY = 5  # secondes après la première interrogation
+WEBSOCKET_START_SPREAD = 30  # étalement des connexions entre entrées (secondes)
+
+# Répartition des requêtes entre entrées
+MAX_CONCURRENT_REQUESTS = 2
+
+# Valeurs des options absentes de l'entrée
+DEFAULT_OPTIONS = {
+    CONF_SCAN_INTERVAL: DEFAULT_SCAN_INTERVAL,
+    CONF_WEBSOCKET: WEBSOCKET_ENABLED,
+    CONF_TIMEOUT: REQUEST_TIMEOUT,
+    CONF_RECONNECT_DELAY: WEBSOCKET_RECONNECT_DELAY,
+    CONF_MAX_CONCURRENT: MAX_CONCURRENT_REQUESTS,
+    CONF_DEADBAND_SCALE: 1.0,
+    CONF_FILTRATION: False,
+    CONF_FILTRATION_ACTION: "",
+    CONF_FILTRATION_CENTER: 14,
+    CONF_FILTRATION_SENSOR: "",
+    CONF_POWER_CURVES: "",
+    CONF_METRICS: False,
+    CONF_MQTT: False,
+    CONF_MQTT_PREFIX: DEFAULT_MQTT_PREFIX,
+}
+
 
+# Alarmes locales
+EVENT_ALARM = f"{DOMAIN}_alarm"
+ALARM_HYSTERESIS = 0.02  # fraction de la plage d'alarme
+
+# Historique en mémoire des capteurs
+HISTORY_CAPACITY = 2880  # points par capteur (24 h à 30 s)
+
+# Grandeurs dérivées de la chimie de l'eau
+DERIVED_METRICS = {
+    "lsi": {"name": "Indice de Langelier", "unit": None, "icon": "mdi:scale-balance", "inputs": ("ph", "temperature")},
+    "free_chlorine": {"name": "Chlore libre estimé", "unit": "mg/L", "icon": "mdi:flask-outline", "inputs": ("redox", "ph")},
+    "chlorine_demand": {"name": "Demande en chlore", "unit": "mg/L/h", "icon": "mdi:flask-minus", "inputs": ("redox", "ph")},
+    "ph_rate": {"name": "Évolution pH", "unit": "pH/h", "icon": "mdi:trending-up", "inputs": ("ph",)},
+    "redox_rate": {"name": "Évolution Redox", "unit": "mV/h", "icon": "mdi:trending-up", "inputs": ("redox",)},
+}
+DERIVED_SMOOTHING = 1800  # constante de temps du lissage exponentiel (secondes)
+LSI_CALCIUM_HARDNESS = 250  # dureté calcique par défaut (mg/L CaCO3)
+LSI_ALKALINITY = 100  # alcalinité totale par défaut (mg/L CaCO3)
+LSI_TDS = 1000  # TDS par défaut sans sonde de conductivité (mg/L)
+CHLORINE_ORP_REF = 700  # redox à 1 mg/L d'acide hypochloreux (mV)
+CHLORINE_ORP_SLOPE = 60  # mV par décade d'acide hypochloreux
+
+# Compteurs de fonctionnement et d'énergie des actions
+# (courbes de puissance : option power_curves, voir accumulators.parse_power_curves)
+RUNTIME_SAVE_DELAY = 60  # secondes
+
+# Planification de la filtration (durée = température / 2)
+FILTRATION_KEYWORDS = ("filtr",)  # détection de l'action de filtration par son nom
+FILTRATION_MIN_HOURS = 2  # heures par jour
+FILTRATION_MAX_HOURS = 24
+FILTRATION_MIN_RUN = 0.25  # reliquat minimal justifiant un démarrage (heures)
+RUNTIME_METRICS = {
+    "runtime_today": {"name": "Durée aujourd'hui", "unit": "h", "icon": "mdi:timer-outline"},
+    "runtime_total": {"name": "Durée totale", "unit": "h", "icon": "mdi:timer"},
+    "cycles_today": {"name": "Cycles aujourd'hui", "unit": None, "icon": "mdi:counter"},
+    "cycles_total": {"name": "Cycles", "unit": None, "icon": "mdi:counter"},
+    "energy": {"name": "Énergie", "unit": "kWh", "icon": "mdi:lightning-bolt"},
+}
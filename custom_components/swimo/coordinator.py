@@ -0,0 +1,353 @@
+# ============================================================================
+# coordinator.py - Coordinateur de données Swimo
+# ============================================================================
+"""Coordinateur Swimo avec diffusion ciblée par enregistrement.
+
+Chaque entité s'abonne avec pour contexte la clé de son enregistrement
+(capteur, appareil, action, alarme). Un rafraîchissement ou une trame
+WebSocket ne réveille que les entités dont l'enregistrement a changé.
+"""
+from datetime import timedelta
+import logging
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
+
+from .accumulators import RuntimeAccumulators, is_running
+
+from .alarms import SwimoAlarmEngine
+from .pyswimo import SwimoAPI, WEBSOCKET_KEY, record_key
+from .const import DOMAIN, EVENT_ALARM, FILTRATION_KEYWORDS, RUNTIME_SAVE_DELAY
+from .derived import DerivedMetrics, sensor_kind
+from .filtration import FiltrationPlanner
+from .history import SensorHistory
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SwimoCoordinator(DataUpdateCoordinator):
+    """Coordinateur qui ne notifie que les entités concernées."""
+
+    def __init__(self, hass: HomeAssistant, api: SwimoAPI, update_interval: timedelta, runtime_store=None,
+                 scheduler=None, poll_offset: float = 0.0, deadband_scale: float = 1.0):
+        # Le premier intervalle porte le décalage de l'entrée, les suivants gardent la phase
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=update_interval + timedelta(seconds=poll_offset),
+        )
+        self.api = api
+        self._base_interval = update_interval
+        self._scheduler = scheduler
+        self.deadband_scale = deadband_scale
+        self.alarms = SwimoAlarmEngine()
+        self.history = {}
+        self.derived = DerivedMetrics()
+        self.runtime = RuntimeAccumulators()
+        self.filtration = None
+        self.replaying = False
+        self._filtration_action = None
+        self._filtration_sensor = None
+        self._ambiguous_temperature = False
+        self._runtime_store = runtime_store
+        self._runtime_saved = 0.0
+        self._index = {}
+        self._versions = {}
+        self._generation = 0
+        self._pending_keys = None
+        self._pushed_keys = None
+        self._flush_handle = None
+        self._last_success = True
+        self._websocket_connected = False
+
+    async def _async_update_data(self):
+        """Récupère les données et calcule les enregistrements modifiés."""
+        if self._scheduler is not None:
+            async with self._scheduler.limit():
+                data = await self.api.get_all_data()
+        else:
+            data = await self.api.get_all_data()
+        index = data.records()
+        
+        # Décalage consommé : l'intervalle suivant reprend la période de base
+        if self.data is not None and self.update_interval != self._base_interval:
+            self.update_interval = self._base_interval
+
+        changed = {key for key, record in index.items() if self._index.get(key) != record}
+        changed.update(self._index.keys() - index.keys())
+
+        # Les trames poussées déjà diffusées n'ont pas à l'être de nouveau
+        self.api.pop_changed_records()
+
+        # Compteurs des actions en fonctionnement
+        for key in self.runtime.tick(time.time(), self._today()):
+            changed.add(("runtime", key[1]))
+
+        self._index = index
+        self._pending_keys = changed
+        self._evaluate_filtration(data)
+        return data
+
+    async def async_load_runtime(self):
+        """Restaure les compteurs de fonctionnement persistés."""
+        if self._runtime_store is not None:
+            self.runtime.load(await self._runtime_store.async_load(), self._today())
+
+    async def async_save_runtime(self):
+        """Persiste immédiatement les compteurs de fonctionnement."""
+        if self._runtime_store is not None:
+            await self._runtime_store.async_save(self.runtime.as_dict())
+
+    @staticmethod
+    def _today() -> str:
+        return dt_util.now().date().isoformat()
+
+    def set_interval(self, interval: timedelta) -> bool:
+        """Change la période d'interrogation, retourne True si elle a changé."""
+        if interval == self._base_interval:
+            return False
+        self._base_interval = interval
+        self.update_interval = interval
+        return True
+
+    def set_filtration(self, enabled: bool, action_number: str = "", center: float = 14,
+                       sensor_number: str = "") -> None:
+        """Active ou désactive la planification locale de la filtration."""
+        if not enabled:
+            self.filtration = None
+            return
+        if (self.filtration is None or self.filtration.center != center
+                or self._filtration_action != action_number or self._filtration_sensor != sensor_number):
+            self.filtration = FiltrationPlanner(center)
+        self._filtration_action = action_number
+        self._filtration_sensor = sensor_number
+
+    def water_temperature_key(self, data=None):
+        """Clé du capteur de température de l'eau : numéro configuré, sinon l'unique sonde de température."""
+        if self._filtration_sensor:
+            return record_key("sensor", self._filtration_sensor)
+        data = data or self.data
+        keys = [
+            sensor.key for sensor in (data.sensors.values() if data else ())
+            if sensor_kind(sensor) == "temperature"
+        ]
+        if len(keys) > 1 and not self._ambiguous_temperature:
+            self._ambiguous_temperature = True
+            _LOGGER.warning(
+                f"{len(keys)} sondes de température : choisissez celle de l'eau (option filtration_sensor)"
+            )
+        return keys[0] if len(keys) == 1 else None
+
+    def set_power_curves(self, curves: dict) -> None:
+        """Courbes de puissance par numéro d'action (option power_curves)."""
+        self.runtime.set_curves({record_key("action", number): curve for number, curve in curves.items()})
+
+    def filtration_key(self, data=None):
+        """Clé de l'action de filtration : numéro configuré, sinon détectée par son nom."""
+        if self._filtration_action:
+            return record_key("action", self._filtration_action)
+        data = data or self.data
+        for action in data.actions.values() if data else ():
+            name = (action.name or "").lower()
+            if any(keyword in name for keyword in FILTRATION_KEYWORDS):
+                return action.key
+        return None
+
+    @callback
+    def _evaluate_filtration(self, data) -> None:
+        """Émet la commande de filtration au franchissement d'un bord de plage."""
+        if self.filtration is None or self.replaying:
+            return
+        key = self.filtration_key(data)
+        action = self._index.get(key) if key else None
+        if action is None:
+            return
+        sensor_key = self.water_temperature_key(data)
+        sensor = data.get(sensor_key) if sensor_key else None
+        temperature = sensor.value if sensor else None
+        local = dt_util.now()
+        command = self.filtration.evaluate(
+            temperature,
+            self.runtime.value(key, "runtime_today"),
+            is_running(action),
+            self._today(),
+            local.hour + local.minute / 60 + local.second / 3600,
+        )
+        if command is None:
+            return
+        _LOGGER.info(f"Filtration {'démarrée' if command else 'arrêtée'} par la planification ({temperature} °C)")
+        self.api.create_background_task(
+            self._async_send_filtration(key[1], command), name=f"swimo_filtration_{key[1]}",
+        )
+
+    async def _async_send_filtration(self, number, command: bool):
+        if await self.api.update_device(key="action_mode", value="1" if command else "0", number=number):
+            await self.async_request_refresh()
+
+    @callback
+    def async_set_deadband_scale(self, scale: float) -> None:
+        """Applique une nouvelle échelle de zones mortes aux capteurs de mesure."""
+        if scale == self.deadband_scale:
+            return
+        self.deadband_scale = scale
+        for update_callback, context in list(self._listeners.values()):
+            if context is not None and context[0] == "sensor":
+                update_callback()
+
+    def get_record(self, key):
+        """Retourne l'enregistrement courant d'une clé."""
+        return self._index.get(key)
+
+    def get_history(self, sensor_number):
+        """Historique en mémoire d'un capteur, None si aucune valeur reçue."""
+        return self.history.get(record_key("sensor", sensor_number))
+
+    def record_version(self, key) -> tuple:
+        """Version d'un enregistrement, incrémentée à chaque diffusion le concernant."""
+        return (self._generation, self._versions.get(key, 0))
+
+    @callback
+    def async_update_records(self, keys) -> None:
+        """Diffuse une mise à jour poussée aux seules entités concernées.
+
+        Les trames reçues pendant un même tour de boucle sont regroupées et
+        diffusées en une seule passe à la fin du tour.
+        """
+        if not keys:
+            return
+        # Snapshot publié par la trame : seuls les enregistrements modifiés changent d'objet
+        self.data = self.api.data
+        for key in keys:
+            record = self.data.get(key)
+            if record is not None:
+                self._index[key] = record
+        if self._pushed_keys is None:
+            self._pushed_keys = set(keys)
+            self._flush_handle = self.hass.loop.call_soon(self._flush_pushed_records)
+        else:
+            self._pushed_keys.update(keys)
+
+    @callback
+    def _flush_pushed_records(self) -> None:
+        """Diffuse en une passe les enregistrements poussés pendant le tour de boucle."""
+        keys, self._pushed_keys, self._flush_handle = self._pushed_keys, None, None
+        self._pending_keys = keys
+        self.async_update_listeners()
+
+    async def async_shutdown(self) -> None:
+        """Annule la diffusion en attente puis arrête le coordinateur."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+            self._pushed_keys = None
+        await super().async_shutdown()
+
+    @callback
+    def async_set_updated_data(self, data) -> None:
+        """Remplace les données et notifie toutes les entités."""
+        self._index = data.records() if data else {}
+        self._pending_keys = None
+        super().async_set_updated_data(data)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notifie les entités dont l'enregistrement a changé."""
+        keys = self._pending_keys
+        self._pending_keys = None
+
+        # Un changement de disponibilité concerne toutes les entités
+        if self.last_update_success != self._last_success:
+            self._last_success = self.last_update_success
+            keys = None
+
+        # L'état du WebSocket figure dans les attributs de chaque capteur de mesure
+        websocket_changed = self.api.is_websocket_connected() != self._websocket_connected
+        if keys is not None and websocket_changed:
+            keys.add(WEBSOCKET_KEY)
+        self._websocket_connected = self.api.is_websocket_connected()
+
+        computed = self._process_records(self._index if keys is None else keys)
+
+        if keys is None:
+            self._generation += 1
+        else:
+            keys |= computed
+            for key in keys:
+                self._versions[key] = self._versions.get(key, 0) + 1
+
+        for update_callback, context in list(self._listeners.values()):
+            if (keys is None or context is None or context in keys
+                    or (websocket_changed and context[0] == "sensor")):
+                update_callback()
+
+    @callback
+    def _process_records(self, keys) -> set:
+        """Traite les enregistrements modifiés, retourne les clés calculées
+        (grandeurs dérivées, compteurs) à notifier en plus.
+
+        Pendant un rejeu, les compteurs persistés et les alarmes ne sont pas
+        alimentés par les données rejouées.
+        """
+        now = time.time()
+        computed = set()
+        runtime_changed = False
+        for key in keys:
+            if key[0] == "action" and key in self._index:
+                if not self.replaying:
+                    self.runtime.observe(key, self._index[key], now, self._today())
+                    computed.add(("runtime", key[1]))
+                    runtime_changed = True
+                continue
+            if key[0] != "sensor":
+                continue
+            sensor = self._index.get(key)
+            if not sensor:
+                continue
+            value = sensor.value
+            if value is not None:
+                history = self.history.get(key)
+                if history is None:
+                    history = self.history[key] = SensorHistory()
+                history.append(now, value)
+                kind = sensor_kind(sensor)
+                if kind:
+                    for metric in self.derived.update(kind, value, now):
+                        computed.add(("derived", metric))
+            if not self.replaying:
+                self._evaluate_alarm(key, sensor)
+
+        if runtime_changed or any(key[0] == "runtime" for key in keys):
+            self._schedule_runtime_save()
+        return computed
+
+    @callback
+    def _schedule_runtime_save(self) -> None:
+        """Programme l'écriture des compteurs, au plus une fois par RUNTIME_SAVE_DELAY."""
+        now = time.monotonic()
+        if self._runtime_store is not None and now - self._runtime_saved >= RUNTIME_SAVE_DELAY:
+            self._runtime_saved = now
+            self._runtime_store.async_delay_save(self.runtime.as_dict, RUNTIME_SAVE_DELAY)
+
+    @callback
+    def _evaluate_alarm(self, key, sensor) -> None:
+        """Évalue localement les seuils d'un capteur et signale les fronts."""
+        edge = self.alarms.evaluate(key, sensor)
+        if edge is None:
+            return
+        active, reason = edge
+        _LOGGER.info(
+            f"Alarme {sensor.name or key[1]} "
+            f"{'déclenchée' if active else 'levée'} (seuil {reason})"
+        )
+        self.hass.bus.async_fire(EVENT_ALARM, {
+            "sensor_number": key[1],
+            "sensor_name": sensor.name,
+            "value": sensor.value,
+            "alarm_min": sensor.alarm_min,
+            "alarm_max": sensor.alarm_max,
+            "threshold": reason,
+            "active": active,
+        })
@@ -0,0 +1,167 @@
+# ============================================================================
+# derived.py - Grandeurs dérivées de la chimie de l'eau
+# ============================================================================
+"""Calcul incrémental des grandeurs dérivées (lissage, tendances, LSI).
+
+Chaque nouvelle valeur d'une grandeur d'entrée (pH, température, redox,
+conductivité) met à jour sa moyenne exponentielle et sa pente, puis
+seules les grandeurs dérivées qui en dépendent sont recalculées.
+"""
+import math
+
+from .const import (
+    CHLORINE_ORP_REF,
+    CHLORINE_ORP_SLOPE,
+    DERIVED_METRICS,
+    DERIVED_SMOOTHING,
+    LSI_ALKALINITY,
+    LSI_CALCIUM_HARDNESS,
+    LSI_TDS,
+    SENSOR_TYPES,
+)
+
+
+def sensor_kind(sensor):
+    """Grandeur mesurée par un capteur ("ph", "temperature"...), None si inconnue."""
+    info = SENSOR_TYPES.get(sensor.type)
+    if info:
+        return info["key"]
+    sensor_hash = sensor.hash.upper()
+    for info in SENSOR_TYPES.values():
+        if any(fragment in sensor_hash for fragment in info["hash"]):
+            return info["key"]
+    return None
+
+
+def langelier_index(ph, temperature, tds, calcium_hardness, alkalinity):
+    """Indice de saturation de Langelier."""
+    a = (math.log10(tds) - 1) / 10
+    b = -13.12 * math.log10(temperature + 273.15) + 34.55
+    c = math.log10(calcium_hardness) - 0.4
+    d = math.log10(alkalinity)
+    return ph - ((9.3 + a + b) - (c + d))
+
+
+def free_chlorine_estimate(redox, ph):
+    """Chlore libre estimé (mg/L) à partir du redox et du pH.
+
+    L'acide hypochloreux est déduit du redox par une relation log-linéaire,
+    puis ramené au chlore libre selon sa fraction à ce pH (pKa 7,54).
+    """
+    hocl = 10 ** ((redox - CHLORINE_ORP_REF) / CHLORINE_ORP_SLOPE)
+    hocl_fraction = 1 / (1 + 10 ** (ph - 7.54))
+    return hocl / hocl_fraction
+
+
+class _Input:
+    """Moyenne exponentielle et pente (par heure) d'une grandeur d'entrée."""
+
+    __slots__ = ("timestamp", "raw", "mean", "slope")
+
+    def __init__(self, timestamp, value):
+        self.timestamp = timestamp
+        self.raw = value
+        self.mean = value
+        self.slope = 0.0
+
+    def update(self, timestamp, value, tau):
+        dt = timestamp - self.timestamp
+        if dt <= 0:
+            self.raw = value
+            return
+        alpha = 1 - math.exp(-dt / tau)
+        mean = self.mean + alpha * (value - self.mean)
+        self.slope += alpha * ((mean - self.mean) / dt * 3600 - self.slope)
+        self.mean = mean
+        self.raw = value
+        self.timestamp = timestamp
+
+
+class DerivedMetrics:
+    """Moteur incrémental des grandeurs dérivées."""
+
+    def __init__(
+        self,
+        smoothing: float = DERIVED_SMOOTHING,
+        calcium_hardness: float = LSI_CALCIUM_HARDNESS,
+        alkalinity: float = LSI_ALKALINITY,
+    ):
+        self.smoothing = smoothing
+        self.calcium_hardness = calcium_hardness
+        self.alkalinity = alkalinity
+        self.values = {}
+        self._inputs = {}
+        self._chlorine = None
+
+    def available(self, kinds) -> list:
+        """Grandeurs dérivées calculables avec les grandeurs d'entrée disponibles."""
+        return [
+            metric for metric, info in DERIVED_METRICS.items()
+            if all(kind in kinds for kind in info["inputs"])
+        ]
+
+    def update(self, kind, value, timestamp) -> set:
+        """Intègre une nouvelle valeur, retourne les grandeurs dérivées modifiées."""
+        current = self._inputs.get(kind)
+        if current is None:
+            self._inputs[kind] = _Input(timestamp, value)
+        elif current.raw == value:
+            return set()
+        else:
+            current.update(timestamp, value, self.smoothing)
+
+        metrics = {
+            metric for metric, info in DERIVED_METRICS.items()
+            if kind in info["inputs"]
+        }
+        if kind == "conductivity" and "temperature" in self._inputs:
+            metrics.add("lsi")
+
+        changed = set()
+        for metric in metrics:
+            value = self._compute(metric, timestamp)
+            if value is not None and value != self.values.get(metric):
+                self.values[metric] = value
+                changed.add(metric)
+        return changed
+
+    def _mean(self, kind):
+        current = self._inputs.get(kind)
+        return current.mean if current else None
+
+    def _compute(self, metric, timestamp):
+        """Recalcule une grandeur dérivée, None si ses entrées manquent."""
+        if metric == "ph_rate":
+            return round(self._inputs["ph"].slope, 3) if "ph" in self._inputs else None
+        if metric == "redox_rate":
+            return round(self._inputs["redox"].slope, 1) if "redox" in self._inputs else None
+
+        ph = self._mean("ph")
+        if ph is None:
+            return None
+
+        if metric == "lsi":
+            temperature = self._mean("temperature")
+            if temperature is None:
+                return None
+            conductivity = self._mean("conductivity")
+            tds = conductivity * 1000 if conductivity else LSI_TDS
+            return round(langelier_index(ph, temperature, tds, self.calcium_hardness, self.alkalinity), 2)
+
+        redox = self._mean("redox")
+        if redox is None:
+            return None
+        chlorine = free_chlorine_estimate(redox, ph)
+
+        if metric == "free_chlorine":
+            return round(chlorine, 2)
+
+        if metric == "chlorine_demand":
+            # Pente lissée de l'estimation, ramenée à une consommation positive
+            if self._chlorine is None:
+                self._chlorine = _Input(timestamp, chlorine)
+            else:
+                self._chlorine.update(timestamp, chlorine, self.smoothing)
+            return round(max(0.0, -self._chlorine.slope), 3)
+
+        return None
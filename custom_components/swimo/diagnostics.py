@@ -0,0 +1,37 @@
+# ============================================================================
+# diagnostics.py - Diagnostics de l'entrée Swimo
+# ============================================================================
+"""Diagnostics téléchargeables depuis la page de l'intégration.
+
+Le client ne garde en mémoire que les champs typés utilisés par les
+plateformes : la réponse get_all brute est récupérée à la demande, au
+moment du téléchargement.
+"""
+from homeassistant.components.diagnostics import async_redact_data
+
+from .const import DOMAIN
+from .pyswimo import record_to_dict
+
+TO_REDACT = {"email", "password", "token", "appid", "user", "code"}
+
+
+async def async_get_config_entry_diagnostics(hass, entry) -> dict:
+    """Diagnostics d'une entrée de configuration."""
+    api = hass.data[DOMAIN][entry.entry_id]["api"]
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    data = api.data
+
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "generation": data.generation,
+        "records": {f"{kind}:{number}": record_to_dict(record) for (kind, number), record in data.records().items()},
+        "raw": async_redact_data(await api.get_raw_data(), TO_REDACT),
+        "parser_rejected": api.parser_rejected,
+        "push_stats": api.push_stats,
+        "push_dropped": api.push_dropped,
+        "request_stats": api.request_stats,
+        "latency": api.latency_stats(),
+        "pending_commands": async_redact_data(api.pending_commands(), TO_REDACT),
+        "last_update_success": coordinator.last_update_success,
+        "filtration": coordinator.filtration.last_plan if coordinator.filtration else None,
+    }
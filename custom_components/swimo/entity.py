@@ -0,0 +1,28 @@
+# ============================================================================
+# entity.py - Entité de base Swimo
+# ============================================================================
+"""Entité de base des plateformes Swimo."""
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+
+class SwimoEntity(CoordinatorEntity):
+    """Entité coordonnée qui n'écrit son état que s'il a changé.
+
+    Le coordinateur réveille l'entité quand son enregistrement change, mais
+    l'état rendu (valeur, attributs, disponibilité) peut rester identique :
+    l'écriture et l'événement state_changed sont alors évités.
+    """
+
+    _written_state = None
+
+    def _rendered_state(self) -> tuple:
+        """État tel qu'il serait écrit dans la machine d'états."""
+        return (self.available, self.state, self.extra_state_attributes)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        rendered = self._rendered_state()
+        if rendered != self._written_state:
+            self._written_state = rendered
+            self.async_write_ha_state()
@@ -0,0 +1,85 @@
+# ============================================================================
+# filters.py - Filtrage des changements non significatifs
+# ============================================================================
+"""Filtre de changement significatif appliqué avant l'écriture d'un état.
+
+Une nouvelle valeur n'est écrite que si elle s'écarte de la dernière
+valeur écrite de plus que la zone morte, et pas plus souvent que le délai
+minimal. Une écriture est forcée après un silence de `heartbeat` secondes.
+Un changement retenu par le délai minimal, comme le battement de cœur, est
+réévalué à l'échéance indiquée par `retry_in`.
+"""
+from .const import DEADBANDS, DEFAULT_DEADBAND
+
+
+class SignificantChangeFilter:
+    """Zone morte absolue/relative, délai minimal et battement de cœur."""
+
+    def __init__(self, absolute=0.0, relative=0.0, min_interval=0.0, heartbeat=None):
+        self.absolute = absolute
+        self.relative = relative
+        self.min_interval = min_interval
+        self.heartbeat = heartbeat
+        self._value = None
+        self._timestamp = None
+
+    @classmethod
+    def for_kind(cls, kind, scale: float = 1.0):
+        """Filtre configuré pour une grandeur de SENSOR_TYPES.
+
+        `scale` multiplie les zones mortes (0 désactive le filtrage).
+        """
+        deadband = DEADBANDS.get(kind, DEFAULT_DEADBAND)
+        if scale <= 0:
+            deadband = DEFAULT_DEADBAND
+            scale = 1.0
+        return cls(
+            absolute=deadband["abs"] * scale,
+            relative=deadband["rel"] * scale,
+            min_interval=deadband["min_interval"],
+            heartbeat=deadband["heartbeat"],
+        )
+
+    def accept(self, value, now: float) -> bool:
+        """Indique si la valeur doit être écrite, et la retient le cas échéant."""
+        if self._timestamp is None or self._significant(value, now):
+            self._value = value
+            self._timestamp = now
+            return True
+        return False
+
+    def _significant(self, value, now: float) -> bool:
+        elapsed = now - self._timestamp
+        if self.heartbeat is not None and elapsed >= self.heartbeat:
+            return True
+        if value == self._value:
+            return False
+        if not isinstance(value, float) or not isinstance(self._value, float):
+            # Valeur non numérique ou apparition/disparition : toujours significatif
+            return True
+        if elapsed < self.min_interval:
+            return False
+        return self._exceeds(value)
+
+    def _exceeds(self, value) -> bool:
+        if not isinstance(value, float) or not isinstance(self._value, float):
+            return True
+        threshold = max(self.absolute, self.relative * abs(self._value))
+        return abs(value - self._value) >= threshold
+
+    def retry_in(self, value, now: float):
+        """Délai (s) avant que `value` ou le battement de cœur impose une écriture, None sinon."""
+        if self._timestamp is None:
+            return None
+        elapsed = now - self._timestamp
+        delays = []
+        if self.heartbeat is not None:
+            delays.append(self.heartbeat - elapsed)
+        if elapsed < self.min_interval and value != self._value and self._exceeds(value):
+            delays.append(self.min_interval - elapsed)
+        return max(min(delays), 0.0) if delays else None
+
+    def reset(self):
+        """Oublie la dernière valeur écrite (la prochaine sera acceptée)."""
+        self._value = None
+        self._timestamp = None
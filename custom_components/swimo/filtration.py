@@ -0,0 +1,82 @@
+# ============================================================================
+# filtration.py - Planification locale de la filtration
+# ============================================================================
+"""Planification quotidienne de la filtration selon la température de l'eau.
+
+Règle classique : durée de filtration (heures) = température / 2, bornée
+et arrondie au quart d'heure. La plage du jour est centrée sur l'heure
+choisie (le plus chaud de la journée) ; sa durée est figée à son début
+pour qu'une variation de température ne la fasse pas osciller.
+
+Le temps déjà filtré dans la journée (compteurs de fonctionnement, marche
+manuelle comprise) est déduit : la filtration s'arrête dès la durée
+atteinte et un reliquat est rattrapé après la fin de la plage. Une
+commande n'est émise qu'au franchissement d'un bord de plage, un
+forçage manuel est donc respecté jusqu'au bord suivant.
+"""
+from .const import FILTRATION_MAX_HOURS, FILTRATION_MIN_HOURS, FILTRATION_MIN_RUN
+
+
+def filtration_hours(temperature: float, min_hours: float = FILTRATION_MIN_HOURS,
+                     max_hours: float = FILTRATION_MAX_HOURS) -> float:
+    """Durée quotidienne de filtration (heures) pour une température (°C)."""
+    hours = round(temperature / 2 * 4) / 4
+    return min(max(hours, min_hours), max_hours)
+
+
+class FiltrationPlanner:
+    """Plage de filtration du jour et décisions de marche/arrêt."""
+
+    def __init__(self, center: float, min_hours: float = FILTRATION_MIN_HOURS,
+                 max_hours: float = FILTRATION_MAX_HOURS, min_run: float = FILTRATION_MIN_RUN):
+        self.center = center
+        self.min_hours = min_hours
+        self.max_hours = max_hours
+        self.min_run = min_run
+        self._day = None
+        self._hours = None
+        self._frozen = False
+        self._desired = None
+        self.last_plan = None
+
+    def plan(self, temperature, day: str, now: float) -> dict:
+        """Plage du jour ({day, hours, start, end} en heures depuis minuit), None sans température."""
+        if day != self._day:
+            self._day = day
+            self._hours = None
+            self._frozen = False
+        if not self._frozen and temperature is not None:
+            self._hours = filtration_hours(temperature, self.min_hours, self.max_hours)
+        if self._hours is None:
+            return None
+
+        start = min(max(self.center - self._hours / 2, 0.0), 24.0 - self._hours)
+        end = start + self._hours
+        if now >= start:
+            self._frozen = True
+        return {"day": day, "hours": self._hours, "start": start, "end": end}
+
+    def evaluate(self, temperature, runtime_today: float, running: bool, day: str, now: float):
+        """Commande à émettre : True (marche), False (arrêt) ou None.
+
+        `runtime_today` est le temps filtré aujourd'hui (heures), `now`
+        l'heure locale en heures depuis minuit.
+        """
+        plan = self.last_plan = self.plan(temperature, day, now)
+        if plan is None:
+            return None
+
+        remaining = plan["hours"] - (runtime_today or 0.0)
+        # Dans la plage ou après elle (rattrapage), tant que la durée n'est pas atteinte
+        if now < plan["start"]:
+            desired = False
+        elif running:
+            desired = remaining > 0
+        else:
+            desired = remaining >= self.min_run
+
+        previous, self._desired = self._desired, desired
+        if previous is None:
+            # Première décision : démarre une plage en cours, n'arrête pas une marche manuelle
+            return True if desired and not running else None
+        return desired if desired != previous else None
@@ -0,0 +1,98 @@
+# ============================================================================
+# history.py - Historique en mémoire des capteurs
+# ============================================================================
+"""Tampon circulaire de valeurs par capteur.
+
+Les valeurs et horodatages sont stockés dans deux `array('d')` de taille
+fixe : la mémoire occupée ne dépend que de la capacité. Les tendances
+(dérive du pH, montée de pression) se lisent ici sans interroger la base
+de l'enregistreur Home Assistant, via le service `swimo.history`.
+"""
+from array import array
+import math
+
+from .const import HISTORY_CAPACITY
+
+
+class SensorHistory:
+    """Historique circulaire (horodatage, valeur) d'un capteur."""
+
+    def __init__(self, capacity: int = HISTORY_CAPACITY):
+        self.capacity = capacity
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp: float, value: float):
+        """Ajoute un point, en écrasant le plus ancien si le tampon est plein."""
+        self._times[self._next] = timestamp
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def latest(self):
+        """Dernier point (horodatage, valeur), None si vide."""
+        if not self._count:
+            return None
+        i = (self._next - 1) % self.capacity
+        return self._times[i], self._values[i]
+
+    def _indexes(self, since: float = None):
+        """Indices des points du plus ancien au plus récent, à partir de `since`."""
+        start = (self._next - self._count) % self.capacity
+        for n in range(self._count):
+            i = (start + n) % self.capacity
+            if since is None or self._times[i] >= since:
+                yield i
+
+    def points(self, since: float = None) -> list:
+        """Points (horodatage, valeur) à partir de `since`."""
+        return [(self._times[i], self._values[i]) for i in self._indexes(since)]
+
+    def downsample(self, bucket: float, until: float, since: float = None) -> list:
+        """Agrège par intervalles de `bucket` secondes, jusqu'à `until`.
+
+        Une valeur n'est enregistrée qu'à son changement : elle vaut jusqu'au
+        point suivant, et la moyenne est pondérée par cette durée. Un
+        intervalle sans point reprend la valeur en cours. Retourne une liste
+        de (début d'intervalle, min, max, moyenne, nombre de points).
+        """
+        indexes = list(self._indexes())
+        if not indexes:
+            return []
+        if since is None:
+            since = self._times[indexes[0]]
+
+        buckets = {}
+
+        def add(start, value, duration):
+            acc = buckets.get(start)
+            if acc is None:
+                acc = buckets[start] = [value, value, 0.0, 0.0, 0]
+            acc[0] = min(acc[0], value)
+            acc[1] = max(acc[1], value)
+            acc[2] += value * duration
+            acc[3] += duration
+            return acc
+
+        for n, i in enumerate(indexes):
+            timestamp, value = self._times[i], self._values[i]
+            end = self._times[indexes[n + 1]] if n + 1 < len(indexes) else until
+            if since <= timestamp < until:
+                add(math.floor(timestamp / bucket) * bucket, value, 0.0)[4] += 1
+            position, end = max(timestamp, since), min(end, until)
+            while position < end:
+                start = math.floor(position / bucket) * bucket
+                stop = min(end, start + bucket)
+                add(start, value, stop - position)
+                position = stop
+
+        return [
+            (start, low, high, total / duration if duration else high, count)
+            for start, (low, high, total, duration, count) in sorted(buckets.items())
+        ]
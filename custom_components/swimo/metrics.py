@@ -0,0 +1,146 @@
+# ============================================================================
+# metrics.py - Export OpenMetrics
+# ============================================================================
+"""Export OpenMetrics des valeurs Swimo et de l'état du client.
+
+Le rendu lit directement l'index du coordinateur et les compteurs de
+SwimoAPI, sans passer par la machine d'états de Home Assistant. Le point
+d'accès exige un jeton d'accès Home Assistant (Bearer) comme le reste de
+l'API REST.
+"""
+import time
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+
+from .accumulators import is_running
+from .const import CONF_METRICS, DOMAIN
+from .derived import sensor_kind
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _escape(value) -> str:
+    """Échappe une valeur d'étiquette."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items() if value is not None) + "}"
+
+
+def render_metrics(entries: dict) -> str:
+    """Rend les métriques des entrées {entry_id: {"api", "coordinator"}}."""
+    families = {
+        "swimo_sensor_value": ("gauge", "Valeur courante des capteurs", []),
+        "swimo_action_running": ("gauge", "Action en fonctionnement", []),
+        "swimo_derived_value": ("gauge", "Grandeurs dérivées calculées localement", []),
+        "swimo_requests": ("counter", "Requêtes HTTP par point d'accès", []),
+        "swimo_request_errors": ("counter", "Requêtes HTTP en échec par point d'accès", []),
+        "swimo_request_duration_seconds": ("summary", "Durée des requêtes HTTP", []),
+        "swimo_request_hedged": ("counter", "Lectures relancées en parallèle après le p95", []),
+        "swimo_request_latency_seconds": ("gauge", "Quantiles récents de latence par point d'accès", []),
+        "swimo_response_bytes": ("counter", "Octets de réponse reçus (compressés) par point d'accès", []),
+        "swimo_response_decoded_bytes": ("counter", "Octets de réponse après décompression par point d'accès", []),
+        "swimo_push_frames": ("counter", "Trames WebSocket reçues par événement", []),
+        "swimo_push_dropped": ("counter", "Trames WebSocket écartées (doublons, trames périmées, capteurs inconnus)", []),
+        "swimo_websocket_up": ("gauge", "Connexion WebSocket établie", []),
+        "swimo_websocket_connections": ("counter", "Connexions WebSocket établies", []),
+        "swimo_token_age_seconds": ("gauge", "Âge du jeton d'accès", []),
+        "swimo_pending_commands": ("gauge", "Commandes en attente d'envoi", []),
+        "swimo_parser_rejected": ("counter", "Enregistrements écartés par le parseur", []),
+    }
+    now = time.time()
+
+    for entry_id, data in entries.items():
+        api = data["api"]
+        coordinator = data["coordinator"]
+        data_snapshot = coordinator.data or api.data
+
+        for sensor in data_snapshot.sensors.values():
+            if sensor.value is not None:
+                families["swimo_sensor_value"][2].append((
+                    "swimo_sensor_value",
+                    _labels(entry=entry_id, sensor=sensor.number,
+                            name=sensor.name, kind=sensor_kind(sensor)),
+                    sensor.value,
+                ))
+        for action in data_snapshot.actions.values():
+            families["swimo_action_running"][2].append((
+                "swimo_action_running",
+                _labels(entry=entry_id, action=action.number, name=action.name),
+                1 if is_running(action) else 0,
+            ))
+        for metric, value in coordinator.derived.values.items():
+            families["swimo_derived_value"][2].append((
+                "swimo_derived_value", _labels(entry=entry_id, metric=metric), value,
+            ))
+
+        for endpoint, stats in api.request_stats.items():
+            labels = _labels(entry=entry_id, endpoint=endpoint)
+            families["swimo_requests"][2].append(("swimo_requests_total", labels, stats["count"]))
+            families["swimo_request_errors"][2].append(("swimo_request_errors_total", labels, stats["errors"]))
+            families["swimo_request_duration_seconds"][2].append(
+                ("swimo_request_duration_seconds_sum", labels, round(stats["duration"], 6)))
+            families["swimo_request_duration_seconds"][2].append(
+                ("swimo_request_duration_seconds_count", labels, stats["count"]))
+            families["swimo_request_hedged"][2].append(("swimo_request_hedged_total", labels, stats["hedged"]))
+            if stats["decoded_bytes"]:
+                families["swimo_response_bytes"][2].append(
+                    ("swimo_response_bytes_total", labels, stats["bytes"]))
+                families["swimo_response_decoded_bytes"][2].append(
+                    ("swimo_response_decoded_bytes_total", labels, stats["decoded_bytes"]))
+        for endpoint, latency in api.latency_stats().items():
+            for quantile in ("p50", "p95", "p99"):
+                if latency[quantile] is not None:
+                    families["swimo_request_latency_seconds"][2].append((
+                        "swimo_request_latency_seconds",
+                        _labels(entry=entry_id, endpoint=endpoint, quantile=f"0.{quantile[1:]}"),
+                        round(latency[quantile], 6),
+                    ))
+        for event, count in api.push_stats.items():
+            families["swimo_push_frames"][2].append(
+                ("swimo_push_frames_total", _labels(entry=entry_id, event=event), count))
+        for reason, count in api.push_dropped.items():
+            families["swimo_push_dropped"][2].append(
+                ("swimo_push_dropped_total", _labels(entry=entry_id, reason=reason), count))
+
+        entry_labels = _labels(entry=entry_id)
+        families["swimo_websocket_up"][2].append(
+            ("swimo_websocket_up", entry_labels, 1 if api.is_websocket_connected() else 0))
+        families["swimo_websocket_connections"][2].append(
+            ("swimo_websocket_connections_total", entry_labels, api.websocket_connections))
+        if api.token_obtained_at is not None:
+            families["swimo_token_age_seconds"][2].append(
+                ("swimo_token_age_seconds", entry_labels, round(now - api.token_obtained_at)))
+        families["swimo_pending_commands"][2].append(
+            ("swimo_pending_commands", entry_labels, len(api.pending_commands())))
+        for kind, count in api.parser_rejected.items():
+            families["swimo_parser_rejected"][2].append(
+                ("swimo_parser_rejected_total", _labels(entry=entry_id, kind=kind), count))
+
+    lines = []
+    for family, (metric_type, help_text, samples) in families.items():
+        if not samples:
+            continue
+        lines.append(f"# TYPE {family} {metric_type}")
+        lines.append(f"# HELP {family} {help_text}")
+        lines.extend(f"{name}{labels} {value}" for name, labels, value in samples)
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class SwimoMetricsView(HomeAssistantView):
+    """Point d'accès OpenMetrics des entrées Swimo qui l'ont activé."""
+
+    url = "/api/swimo/metrics"
+    name = "api:swimo:metrics"
+    requires_auth = True
+
+    async def get(self, request: web.Request) -> web.Response:
+        hass = request.app["hass"]
+        entries = {
+            entry_id: data for entry_id, data in hass.data.get(DOMAIN, {}).items()
+            if isinstance(data, dict) and data.get(CONF_METRICS)
+        }
+        return web.Response(body=render_metrics(entries).encode(), headers={"Content-Type": CONTENT_TYPE})
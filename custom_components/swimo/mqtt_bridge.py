@@ -0,0 +1,106 @@
+# ============================================================================
+# mqtt_bridge.py - Passerelle MQTT
+# ============================================================================
+"""Publication des enregistrements Swimo sur le broker MQTT de Home Assistant.
+
+Chaque enregistrement est publié en message retenu sur son propre topic
+(`<préfixe>/<entrée>/<type>/<numéro>`), uniquement quand sa charge utile a
+changé. Un enregistrement resté le même objet d'une génération à l'autre
+n'est pas sérialisé à nouveau. Les commandes reçues sur
+`<préfixe>/<entrée>/command/<clé>/<numéro>` passent par `update_device`.
+"""
+import json
+import logging
+
+from homeassistant.components import mqtt
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ServiceValidationError
+
+from .pyswimo import record_to_dict
+from .services import validate_change
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def record_payload(record) -> str:
+    """Charge utile compacte d'un enregistrement (champs renseignés, sans le brut)."""
+    return json.dumps(record_to_dict(record), separators=(",", ":"), ensure_ascii=False)
+
+
+class SwimoMqttBridge:
+    """Passerelle entre une entrée Swimo et MQTT."""
+
+    def __init__(self, hass: HomeAssistant, coordinator, prefix: str, entry_id: str):
+        self._hass = hass
+        self._coordinator = coordinator
+        self._api = coordinator.api
+        self.prefix = prefix
+        self._base = f"{prefix}/{entry_id}"
+        self._published = {}
+        self._unsubscribe = []
+        self.started = False
+        self.published_count = 0
+
+    async def async_start(self) -> bool:
+        """Abonne la passerelle aux commandes et publie l'état courant."""
+        if not await mqtt.async_wait_for_mqtt_client(self._hass):
+            _LOGGER.warning("Passerelle MQTT Swimo : client MQTT indisponible")
+            return False
+
+        self._unsubscribe.append(await mqtt.async_subscribe(
+            self._hass, f"{self._base}/command/+/+", self._command_received,
+        ))
+        self._unsubscribe.append(self._coordinator.async_add_listener(self._publish_changes))
+        await mqtt.async_publish(self._hass, f"{self._base}/status", "online", retain=True)
+        self.started = True
+        self._publish_changes()
+        _LOGGER.info(f"Passerelle MQTT Swimo active sur {self._base}/#")
+        return True
+
+    async def async_stop(self):
+        """Désabonne la passerelle et signale l'entrée hors ligne."""
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe.clear()
+        if not self.started:
+            return
+        self.started = False
+        await mqtt.async_publish(self._hass, f"{self._base}/status", "offline", retain=True)
+
+    @callback
+    def _publish_changes(self) -> None:
+        """Publie les enregistrements modifiés depuis la dernière publication."""
+        data = self._coordinator.data
+        # Les données rejouées ne sont pas publiées sur les topics retenus
+        if not data or self._coordinator.replaying:
+            return
+        for key, record in data.records().items():
+            published, previous = self._published.get(key, (None, None))
+            if published is record:
+                continue
+            payload = record_payload(record)
+            self._published[key] = (record, payload)
+            if payload == previous:
+                continue
+            topic = f"{self._base}/{key[0]}" if key[1] is None else f"{self._base}/{key[0]}/{key[1]}"
+            self._api.create_background_task(
+                mqtt.async_publish(self._hass, topic, payload, retain=True)
+            )
+            self.published_count += 1
+
+    @callback
+    def _command_received(self, message) -> None:
+        """Commande reçue : <base>/command/<clé>/<numéro>, valeur en charge utile."""
+        key, number = message.topic.rsplit("/", 2)[-2:]
+        value = message.payload.decode() if isinstance(message.payload, bytes) else str(message.payload)
+        change = {"key": key, "value": value.strip(), "number": number}
+        try:
+            validate_change(self._coordinator.data, change)
+        except ServiceValidationError as e:
+            _LOGGER.warning(f"Commande MQTT {message.topic} ignorée: {e}")
+            return
+        self._api.create_background_task(self._send(change), name=f"swimo_mqtt_{key}_{number}")
+
+    async def _send(self, change: dict):
+        if await self._api.update_device(change["key"], change["value"], change["number"]):
+            await self._coordinator.async_request_refresh()
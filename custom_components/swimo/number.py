@@ -6,10 +6,10 @@ from homeassistant.components.number import NumberEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 import logging
 
 from .const import DOMAIN
+from .entity import SwimoEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,52 +25,41 @@ async def async_setup_entry(
     entities = []
     
     # Chercher les actions avec setpoint (chauffage, pompes doseuses)
-    actions = coordinator.data.get("actions", [])
-    for action in actions:
-        if action.get("device_setpoint") and action.get("device_min_setpoint"):
+    for action in coordinator.data.actions.values():
+        if action.setpoint is not None and action.min_setpoint is not None:
             entities.append(SwimoSetpoint(coordinator, api, action, entry.entry_id))
-            _LOGGER.debug(f"Number créé: {action.get('device_name')} setpoint")
+            _LOGGER.debug(f"Number créé: {action.device_name} setpoint")
     
     async_add_entities(entities)
 
 
-class SwimoSetpoint(CoordinatorEntity, NumberEntity):
+class SwimoSetpoint(SwimoEntity, NumberEntity):
     """Entité pour régler une consigne."""
     
     def __init__(self, coordinator, api, device_data, entry_id):
-        super().__init__(coordinator)
+        self._record_key = device_data.key
+        super().__init__(coordinator, context=self._record_key)
         self._api = api
-        self._device_data = device_data
-        self._device_num = device_data.get("device_number")
+        self._device_num = device_data.device_number
         
-        device_name = device_data.get("device_name", f"Device {self._device_num}")
+        device_name = device_data.device_name or f"Device {self._device_num}"
         self._attr_name = f"Swimo {device_name} Consigne"
         self._attr_unique_id = f"swimo_{entry_id}_setpoint_{self._device_num}"
         self._attr_icon = "mdi:target"
         
         # Limites et unité
-        try:
-            self._attr_native_min_value = float(device_data.get("device_min_setpoint", 0))
-            self._attr_native_max_value = float(device_data.get("device_max_setpoint", 100))
-        except:
-            self._attr_native_min_value = 0
-            self._attr_native_max_value = 100
+        self._attr_native_min_value = device_data.min_setpoint if device_data.min_setpoint is not None else 0
+        self._attr_native_max_value = device_data.max_setpoint if device_data.max_setpoint is not None else 100
         
         self._attr_native_step = 0.5
-        self._attr_native_unit_of_measurement = device_data.get("device_unit_setpoint", "")
+        self._attr_native_unit_of_measurement = device_data.setpoint_unit
     
     @property
     def native_value(self):
         """Valeur actuelle."""
-        actions = self.coordinator.data.get("actions", [])
-        for action in actions:
-            if action.get("device_number") == self._device_num:
-                setpoint = action.get("device_setpoint")
-                if setpoint:
-                    try:
-                        return float(setpoint)
-                    except:
-                        pass
+        action = self.coordinator.get_record(self._record_key)
+        if action and action.setpoint is not None:
+            return action.setpoint
         return None
     
     async def async_set_native_value(self, value: float) -> None:
@@ -0,0 +1,130 @@
+# ============================================================================
+# profiler.py - Profilage à la demande
+# ============================================================================
+"""Profilage CPU (cProfile) et mémoire (tracemalloc) des chemins Swimo.
+
+Le profileur s'active sur la boucle d'événements pendant une durée donnée
+puis écrit un rapport texte : répartition du temps par catégorie (parseur,
+JSON, entités, diffusion, attente réseau), fonctions les plus coûteuses de
+l'intégration et sites d'allocation dans ses modules. Les statistiques
+brutes sont aussi écrites au format .prof (snakeviz, pstats).
+"""
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Catégories de temps : (nom, fragments de chemin), la première qui correspond l'emporte
+CATEGORIES = (
+    ("client Swimo (parseur, WebSocket)", (f"{os.sep}pyswimo{os.sep}",)),
+    ("entités Swimo", tuple(f"{os.sep}swimo{os.sep}{name}.py" for name in ("sensor", "binary_sensor", "switch", "number"))),
+    ("coordinateur Swimo", (f"{os.sep}swimo{os.sep}",)),
+    ("JSON", (f"{os.sep}json{os.sep}",)),
+    ("diffusion Home Assistant", (
+        "update_coordinator.py",
+        f"{os.sep}helpers{os.sep}entity.py",
+        f"{os.sep}homeassistant{os.sep}core.py",
+    )),
+    ("attente réseau / boucle inactive", ("selectors.py",)),
+)
+
+
+def categorize(filename: str) -> str:
+    """Catégorie d'une fonction profilée d'après son fichier."""
+    for name, fragments in CATEGORIES:
+        if any(fragment in filename for fragment in fragments):
+            return name
+    return "autres"
+
+
+class SwimoProfiler:
+    """Session de profilage CPU et mémoire."""
+
+    def __init__(self, package_dir: str = PACKAGE_DIR):
+        self._package_dir = package_dir
+        self._profile = None
+        self._baseline = None
+        self._snapshot = None
+        self._owns_tracemalloc = False
+        self._started = None
+        self.duration = 0.0
+
+    def start(self):
+        """Démarre le profilage, ValueError si un autre profileur est actif."""
+        profile = cProfile.Profile()
+        profile.enable()
+        self._profile = profile
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        self._baseline = tracemalloc.take_snapshot()
+        self._started = time.monotonic()
+
+    def stop(self):
+        """Arrête le profilage et conserve les mesures."""
+        self._profile.disable()
+        self.duration = time.monotonic() - self._started
+        self._snapshot = tracemalloc.take_snapshot()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+
+    def write_report(self, path: str, top: int = 25) -> dict:
+        """Écrit le rapport (bloquant, à exécuter hors boucle) et retourne un résumé."""
+        stats = pstats.Stats(self._profile)
+        self._profile.dump_stats(f"{os.path.splitext(path)[0]}.prof")
+
+        by_category = {}
+        for (filename, _, _), (_, _, tottime, _, _) in stats.stats.items():
+            category = categorize(filename)
+            by_category[category] = by_category.get(category, 0.0) + tottime
+        total = sum(by_category.values()) or 1.0
+
+        package = re.escape(self._package_dir)
+        traces = self._snapshot.filter_traces([tracemalloc.Filter(True, f"{self._package_dir}{os.sep}*")])
+        baseline = self._baseline.filter_traces([tracemalloc.Filter(True, f"{self._package_dir}{os.sep}*")])
+
+        with open(path, "w", encoding="utf-8") as report:
+            report.write(f"Profil Swimo du {datetime.now().isoformat(timespec='seconds')}\n")
+            report.write(f"Durée : {self.duration:.1f} s, Python {sys.version.split()[0]}\n\n")
+
+            report.write("== Temps propre par catégorie ==\n")
+            for category, seconds in sorted(by_category.items(), key=lambda item: -item[1]):
+                report.write(f"{category:<36} {seconds:9.3f} s  {seconds / total:6.1%}\n")
+
+            report.write("\n== Fonctions de l'intégration (temps cumulé) ==\n")
+            report.write(self._format(stats, "cumulative", top, package))
+
+            report.write("\n== Toutes fonctions (temps propre) ==\n")
+            report.write(self._format(stats, "tottime", top))
+
+            report.write("\n== Mémoire allouée par ligne de l'intégration ==\n")
+            for stat in traces.statistics("lineno")[:top]:
+                report.write(f"{stat}\n")
+
+            report.write("\n== Croissance mémoire pendant le profilage ==\n")
+            for stat in traces.compare_to(baseline, "lineno")[:top]:
+                if stat.size_diff:
+                    report.write(f"{stat}\n")
+
+        return {
+            "duration": round(self.duration, 1),
+            "categories": {category: round(seconds, 3) for category, seconds in by_category.items()},
+        }
+
+    @staticmethod
+    def _format(stats: pstats.Stats, sort: str, top: int, pattern: str = None) -> str:
+        stream = io.StringIO()
+        stats.stream = stream
+        stats.sort_stats(sort)
+        if pattern:
+            stats.print_stats(pattern, top)
+        else:
+            stats.print_stats(top)
+        return stream.getvalue()
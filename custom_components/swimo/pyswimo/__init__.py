@@ -0,0 +1,51 @@
+# ============================================================================
+# custom_components/swimo/pyswimo/__init__.py
+# ============================================================================
+"""Client Swimo indépendant de Home Assistant.
+
+Client HTTP/WebSocket, parseur, modèle de snapshot et captures, utilisés
+par l'intégration comme par la ligne de commande :
+
+    PYTHONPATH=custom_components/swimo python -m pyswimo watch
+"""
+from .api import (
+    COMMAND_FIELDS,
+    SYSTEM_KEY,
+    WEBSOCKET_KEY,
+    ActionRecord,
+    AlarmRecord,
+    CommandJournal,
+    DeviceRecord,
+    SensorRecord,
+    SwimoAPI,
+    SwimoData,
+    SwimoParser,
+    SystemRecord,
+    check_change,
+    command_record,
+    record_key,
+    record_to_dict,
+)
+from .capture import CaptureReplayer, CaptureWriter, read_capture
+
+__all__ = [
+    "COMMAND_FIELDS",
+    "SYSTEM_KEY",
+    "WEBSOCKET_KEY",
+    "ActionRecord",
+    "AlarmRecord",
+    "CaptureReplayer",
+    "CaptureWriter",
+    "CommandJournal",
+    "DeviceRecord",
+    "SensorRecord",
+    "SwimoAPI",
+    "SwimoData",
+    "SwimoParser",
+    "SystemRecord",
+    "check_change",
+    "command_record",
+    "read_capture",
+    "record_key",
+    "record_to_dict",
+]
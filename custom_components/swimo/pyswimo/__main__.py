@@ -0,0 +1,4 @@
+"""Point d'entrée `python -m pyswimo`."""
+from .cli import main
+
+main()
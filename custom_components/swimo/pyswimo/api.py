@@ -0,0 +1,1515 @@
+# ============================================================================
+# custom_components/swimo/pyswimo/api.py
+# ============================================================================
+
+import aiohttp
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields, replace
+from datetime import datetime, timedelta
+from types import MappingProxyType
+import logging
+import socketio
+import json
+import time
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# Clés des enregistrements hors listes
+WEBSOCKET_KEY = ("websocket", None)
+SYSTEM_KEY = ("system", None)
+
+# Version du format get_all comprise par le parseur
+SCHEMA_VERSION = 1
+
+
+def record_key(kind: str, number) -> tuple:
+    """Clé d'un enregistrement (capteur, appareil, action, alarme)."""
+    return (kind, str(number))
+
+
+# ----------------------------------------------------------------------------
+# Enregistrements typés
+# ----------------------------------------------------------------------------
+
+@dataclass(frozen=True, slots=True)
+class SensorRecord:
+    """Capteur de mesure."""
+    number: str
+    index: str = None
+    name: str = None
+    value: float = None
+    value_text: str = None
+    unit: str = None
+    hash: str = ""
+    type: int = None
+    status: str = None
+    alarm: bool = False
+    alarm_min: float = None
+    alarm_max: float = None
+    raw_value: str = None
+    text: str = None
+    # Horodatage serveur (epoch), quand la réponse ou la trame en porte un
+    updated: float = field(default=None, compare=False)
+    
+    @property
+    def key(self) -> tuple:
+        return record_key("sensor", self.number)
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceRecord:
+    """Équipement commandable."""
+    number: str
+    name: str = None
+    type: str = ""
+    mode: int = 0
+    status: int = 0
+    
+    @property
+    def key(self) -> tuple:
+        return record_key("device", self.number)
+
+
+@dataclass(frozen=True, slots=True)
+class ActionRecord:
+    """Action (filtration, chauffage, dosage...) et sa consigne éventuelle."""
+    number: str
+    name: str = None
+    status: int = 0
+    mode: int = 0
+    speed: int = 0
+    runtime: int = 0
+    device_number: str = None
+    device_name: str = None
+    setpoint: float = None
+    min_setpoint: float = None
+    max_setpoint: float = None
+    setpoint_unit: str = ""
+    updated: float = field(default=None, compare=False)
+    
+    @property
+    def key(self) -> tuple:
+        return record_key("action", self.number)
+
+
+@dataclass(frozen=True, slots=True)
+class AlarmRecord:
+    """Alarme système."""
+    number: str
+    name: str = None
+    status: int = 0
+    
+    @property
+    def key(self) -> tuple:
+        return record_key("alarm", self.number)
+
+
+@dataclass(frozen=True, slots=True)
+class SystemRecord:
+    """Informations système."""
+    name: str = None
+    volume: float = None
+
+
+@dataclass(frozen=True)
+class SwimoData:
+    """Snapshot typé et immuable, enregistrements indexés par numéro.
+    
+    Une mise à jour produit un nouveau snapshot (generation + 1) qui partage
+    les enregistrements et collections inchangés avec le précédent : un
+    lecteur qui tient un snapshot le voit toujours cohérent.
+    """
+    schema: int = SCHEMA_VERSION
+    generation: int = 0
+    sensors: dict = field(default_factory=dict)
+    devices: dict = field(default_factory=dict)
+    actions: dict = field(default_factory=dict)
+    alarms: dict = field(default_factory=dict)
+    system: SystemRecord = None
+    
+    def __post_init__(self):
+        for name in ("sensors", "devices", "actions", "alarms"):
+            collection = getattr(self, name)
+            if not isinstance(collection, MappingProxyType):
+                object.__setattr__(self, name, MappingProxyType(collection))
+    
+    def __bool__(self) -> bool:
+        return bool(self.sensors or self.devices or self.actions or self.alarms or self.system)
+    
+    def get(self, key):
+        """Enregistrement d'une clé, None si absent."""
+        if key == SYSTEM_KEY:
+            return self.system
+        collection = getattr(self, f"{key[0]}s", None)
+        return collection.get(key[1]) if isinstance(collection, MappingProxyType) else None
+    
+    def records(self) -> dict:
+        """Tous les enregistrements par clé."""
+        index = {}
+        for collection in (self.sensors, self.devices, self.actions, self.alarms):
+            for record in collection.values():
+                index[record.key] = record
+        if self.system is not None:
+            index[SYSTEM_KEY] = self.system
+        return index
+    
+    def find_sensor(self, number):
+        """Capteur désigné par le sensorNum d'une trame WebSocket.
+        
+        sensorNum porte l'index du capteur : le numéro n'est utilisé que si
+        aucun capteur n'a d'index, un numéro pouvant égaler l'index d'un
+        autre capteur.
+        """
+        number = str(number)
+        if any(s.index is not None for s in self.sensors.values()):
+            return next((s for s in self.sensors.values() if s.index == number), None)
+        return self.sensors.get(number)
+
+
+# ----------------------------------------------------------------------------
+# Parseur
+# ----------------------------------------------------------------------------
+
+# Noms acceptés pour chaque champ, par ordre de priorité
+SENSOR_FIELDS = {
+    "number": ("sensor_number", "sensor_index", "sensorNum"),
+    "index": ("sensor_index", "sensorNum"),
+    # sensor_min porte la valeur courante dans les réponses get_all
+    "value": ("sensor_min", "sensor_value", "value", "sensor_max"),
+}
+ACTION_NUMBER_FIELDS = ("action_index", "actionNum")
+TIME_FIELDS = ("timestamp", "updated_at", "updatedAt", "date", "time")
+ALARM_NUMBER_FIELDS = ("alarm_index", "alarm_number")
+
+
+def _first(raw: dict, names):
+    """Première valeur renseignée parmi des noms de champ équivalents."""
+    for name in names:
+        value = raw.get(name)
+        if value is not None and value != "":
+            return value
+    return None
+
+
+def _float(value):
+    """Float ou None si absent ou non numérique."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _int(value, default: int = 0) -> int:
+    """Entier, `default` si absent ou non numérique."""
+    try:
+        return int(float(value))
+    except (ValueError, TypeError):
+        return default
+
+
+def _str(value):
+    """Chaîne ou None si absent."""
+    if value is None or value == "":
+        return None
+    return str(value)
+
+
+def _flag(value) -> bool:
+    """Drapeau "1"/1/True."""
+    return str(value).strip().lower() in ("1", "true")
+
+
+def _timestamp(value):
+    """Horodatage epoch (secondes) depuis un epoch en s/ms ou une date ISO, None sinon."""
+    number = _float(value)
+    if number is not None:
+        return number / 1000 if number > 1e11 else number
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+class SwimoParser:
+    """Convertit les réponses get_all et les trames WebSocket en enregistrements typés.
+    
+    Les enregistrements mal formés sont écartés et comptés dans `rejected`
+    plutôt que de lever une exception.
+    """
+    
+    def __init__(self):
+        self.rejected = {}
+        self._schema_warned = False
+    
+    def _reject(self, kind: str, raw):
+        self.rejected[kind] = self.rejected.get(kind, 0) + 1
+        _LOGGER.debug(f"Enregistrement {kind} rejeté: {raw}")
+    
+    def parse_snapshot(self, payload) -> SwimoData:
+        """Convertit une réponse get_all."""
+        if not isinstance(payload, dict):
+            self._reject("snapshot", payload)
+            return SwimoData()
+        
+        schema = _int(payload.get("schema_version"), SCHEMA_VERSION)
+        if schema != SCHEMA_VERSION and not self._schema_warned:
+            _LOGGER.warning(f"Format get_all version {schema} inconnu, lecture au format {SCHEMA_VERSION}")
+            self._schema_warned = True
+        
+        collections = {"sensors": {}, "devices": {}, "actions": {}, "alarms": {}}
+        for kind, parse, collection in (
+            ("sensor", self.parse_sensor, collections["sensors"]),
+            ("device", self.parse_device, collections["devices"]),
+            ("action", self.parse_action, collections["actions"]),
+            ("alarm", self.parse_alarm, collections["alarms"]),
+        ):
+            items = payload.get(f"{kind}s") or []
+            if not isinstance(items, list):
+                self._reject(kind, items)
+                continue
+            for raw in items:
+                record = parse(raw) if isinstance(raw, dict) else None
+                if record is None:
+                    self._reject(kind, raw)
+                else:
+                    collection[record.number] = record
+        
+        system = payload.get("system")
+        if isinstance(system, list):
+            system = system[0] if system else None
+        if isinstance(system, dict):
+            system = SystemRecord(name=_str(system.get("sys_name")), volume=_float(system.get("sys_volume")))
+        else:
+            system = None
+        return SwimoData(schema=schema, system=system, **collections)
+    
+    def parse_sensor(self, raw: dict):
+        number = _first(raw, SENSOR_FIELDS["number"])
+        if number is None:
+            return None
+        value = _first(raw, SENSOR_FIELDS["value"])
+        text = raw.get("sensor_text")
+        return SensorRecord(
+            number=str(number),
+            index=_str(_first(raw, SENSOR_FIELDS["index"])),
+            name=_str(raw.get("sensor_name")),
+            value=_float(value),
+            value_text=None if _float(value) is not None else _str(value),
+            unit=_str(raw.get("sensor_unit")),
+            hash=str(raw.get("sensor_hash") or ""),
+            type=_int(raw.get("sensor_type"), None),
+            status=_str(raw.get("sensor_status")),
+            alarm=_flag(raw.get("sensor_alarm")),
+            alarm_min=_float(raw.get("sensor_alarm_min")),
+            alarm_max=_float(raw.get("sensor_alarm_max")),
+            raw_value=raw.get("sensor_raw_sensor"),
+            text=text.strip() if isinstance(text, str) else None,
+            updated=_timestamp(_first(raw, TIME_FIELDS)),
+        )
+    
+    def parse_device(self, raw: dict):
+        number = raw.get("device_index")
+        if number is None or number == "":
+            return None
+        return DeviceRecord(
+            number=str(number),
+            name=_str(raw.get("device_name")),
+            type=str(raw.get("device_type") or "").lower(),
+            mode=_int(raw.get("device_mode")),
+            status=_int(raw.get("device_status")),
+        )
+    
+    def parse_action(self, raw: dict):
+        number = _first(raw, ACTION_NUMBER_FIELDS)
+        if number is None:
+            return None
+        return ActionRecord(
+            number=str(number),
+            name=_str(raw.get("action_name")),
+            status=_int(raw.get("status")),
+            mode=_int(raw.get("mode")),
+            speed=_int(raw.get("speed")),
+            runtime=_int(raw.get("runtime")),
+            device_number=_str(raw.get("device_number")),
+            device_name=_str(raw.get("device_name")),
+            setpoint=_float(raw.get("device_setpoint")),
+            min_setpoint=_float(raw.get("device_min_setpoint")),
+            max_setpoint=_float(raw.get("device_max_setpoint")),
+            setpoint_unit=str(raw.get("device_unit_setpoint") or ""),
+            updated=_timestamp(_first(raw, TIME_FIELDS)),
+        )
+    
+    def parse_alarm(self, raw: dict):
+        number = _first(raw, ALARM_NUMBER_FIELDS)
+        if number is None:
+            return None
+        return AlarmRecord(
+            number=str(number),
+            name=_str(raw.get("alarm_name")),
+            status=_int(raw.get("alarm_status")),
+        )
+    
+    def parse_sensor_frame(self, update):
+        """Trame capteur WebSocket : (numéro, champs modifiés) ou None."""
+        if not isinstance(update, dict) or not update.get("sensorNum"):
+            self._reject("sensor_frame", update)
+            return None
+        changes = {}
+        if "value" in update:
+            value = update["value"]
+            changes["value"] = _float(value)
+            changes["value_text"] = None if _float(value) is not None else _str(value)
+        if "valueRaw" in update:
+            changes["raw_value"] = update["valueRaw"]
+        updated = _timestamp(_first(update, TIME_FIELDS))
+        if updated is not None:
+            changes["updated"] = updated
+        return str(update["sensorNum"]), changes
+    
+    def parse_action_frame(self, update):
+        """Trame action WebSocket : (numéro, champs modifiés) ou None."""
+        if not isinstance(update, dict) or not update.get("actionNum"):
+            self._reject("action_frame", update)
+            return None
+        changes = {
+            name: _int(update[name])
+            for name in ("status", "mode", "speed", "runtime")
+            if name in update
+        }
+        updated = _timestamp(_first(update, TIME_FIELDS))
+        if updated is not None:
+            changes["updated"] = updated
+        return str(update["actionNum"]), changes
+
+
+# Champ du snapshot reflétant chaque commande : (collection, attribut numéro, attribut valeur)
+COMMAND_FIELDS = {
+    "device_mode": ("devices", "number", "mode"),
+    "action_mode": ("actions", "number", "mode"),
+    "device_setpoint": ("actions", "device_number", "setpoint"),
+}
+
+
+def command_record(data: SwimoData, key: str, number):
+    """Enregistrement visé par une commande, None si introuvable."""
+    collection_name, number_field, _ = COMMAND_FIELDS[key]
+    return next(
+        (r for r in getattr(data, collection_name).values() if str(getattr(r, number_field)) == str(number)),
+        None,
+    )
+
+
+def check_change(data: SwimoData, change: dict) -> None:
+    """Vérifie une commande {key, value, number} contre un snapshot, ValueError sinon."""
+    if change["key"] not in COMMAND_FIELDS:
+        raise ValueError(f"Commande inconnue: {change['key']}")
+    record = command_record(data, change["key"], change["number"])
+    if record is None:
+        raise ValueError(f"{change['key']} : numéro {change['number']} introuvable")
+    
+    value = str(change["value"])
+    if change["key"] in ("device_mode", "action_mode"):
+        if value not in ("0", "1"):
+            raise ValueError(f"{change['key']} : valeur {value} invalide (0 ou 1)")
+        return
+    
+    try:
+        setpoint = float(value)
+    except (ValueError, TypeError):
+        raise ValueError(f"{change['key']} : valeur {value} invalide")
+    low = record.min_setpoint if record.min_setpoint is not None else setpoint
+    high = record.max_setpoint if record.max_setpoint is not None else setpoint
+    if not low <= setpoint <= high:
+        raise ValueError(f"{change['key']} : {setpoint} hors limites [{low}, {high}]")
+
+
+def record_to_dict(record) -> dict:
+    """Champs renseignés d'un enregistrement."""
+    values = {}
+    for item in fields(record):
+        value = getattr(record, item.name)
+        if value is not None:
+            values[item.name] = value
+    return values
+
+
+def _same_value(current, expected) -> bool:
+    """Compare une valeur du snapshot à la valeur d'une commande."""
+    try:
+        return float(current) == float(expected)
+    except (ValueError, TypeError):
+        return str(current) == str(expected)
+
+
+class CommandJournal:
+    """Journal ordonné et persistant des commandes en attente d'envoi.
+
+    `store` est optionnel et doit fournir `async_load()` et `async_save(data)`
+    (un `Store` Home Assistant convient). Une commande pour le même couple
+    (key, number) remplace la précédente encore en attente.
+    """
+    
+    MAX_AGE = timedelta(hours=12)
+    
+    def __init__(self, store=None):
+        self._store = store
+        self.pending = []
+    
+    async def async_load(self):
+        """Recharge les commandes en attente, en écartant les trop anciennes."""
+        if self._store is None:
+            return
+        stored = await self._store.async_load() or {}
+        self.pending = stored.get("commands", [])
+        self.drop_expired()
+        if self.pending:
+            _LOGGER.info(f"{len(self.pending)} commande(s) en attente rechargée(s)")
+    
+    async def async_save(self):
+        """Persiste les commandes en attente."""
+        if self._store is not None:
+            await self._store.async_save({"commands": self.pending})
+    
+    def add(self, key: str, value: str, number=None) -> dict:
+        """Ajoute une commande en fin de journal, remplaçant celle du même couple (key, number)."""
+        self.pending = [
+            command for command in self.pending
+            if (command["key"], str(command["number"])) != (key, str(number))
+        ]
+        command = {
+            "key": key,
+            "value": value,
+            "number": number,
+            "created": datetime.now().isoformat(),
+            "attempts": 0,
+        }
+        self.pending.append(command)
+        return command
+    
+    def drop_expired(self) -> int:
+        """Écarte les commandes trop anciennes pour être encore pertinentes."""
+        limit = datetime.now() - self.MAX_AGE
+        kept = []
+        for command in self.pending:
+            try:
+                if datetime.fromisoformat(command["created"]) >= limit:
+                    kept.append(command)
+            except (KeyError, TypeError, ValueError):
+                continue
+        dropped = len(self.pending) - len(kept)
+        if dropped:
+            _LOGGER.warning(f"{dropped} commande(s) expirée(s) abandonnée(s)")
+        self.pending = kept
+        return dropped
+    
+    def remove(self, command: dict) -> bool:
+        """Retire une commande (sans effet si elle a été remplacée entre-temps)."""
+        for i, pending in enumerate(self.pending):
+            if pending is command:
+                del self.pending[i]
+                return True
+        return False
+    
+    def reconcile(self, data: SwimoData) -> int:
+        """Retire les commandes déjà reflétées par un snapshot, retourne leur nombre."""
+        applied = []
+        for command in self.pending:
+            if command["key"] not in COMMAND_FIELDS or command["number"] is None:
+                continue
+            record = command_record(data, command["key"], command["number"])
+            value_field = COMMAND_FIELDS[command["key"]][2]
+            if record is not None and _same_value(getattr(record, value_field), command["value"]):
+                applied.append(command)
+        for command in applied:
+            self.remove(command)
+        return len(applied)
+
+
+# ----------------------------------------------------------------------------
+# Transfert compressé
+# ----------------------------------------------------------------------------
+
+# Encodages demandés pour get_all (brotli si le module est installé)
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli else "gzip, deflate"
+
+# Taille des blocs lus sur le flux de réponse (octets)
+CHUNK_SIZE = 65536
+
+
+class StreamDecoder:
+    """Décompression incrémentale d'un corps HTTP selon son Content-Encoding."""
+    
+    def __init__(self, encoding: str = None):
+        self.encoding = (encoding or "identity").strip().lower()
+        if self.encoding in ("gzip", "x-gzip"):
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self.encoding == "deflate":
+            self._decompressor = zlib.decompressobj()
+        elif self.encoding == "br" and brotli is not None:
+            self._decompressor = brotli.Decompressor()
+        elif self.encoding == "identity":
+            self._decompressor = None
+        else:
+            raise ValueError(f"Encodage de réponse non pris en charge : {self.encoding}")
+        # Octets deflate reçus tant que l'en-tête zlib n'est pas confirmé
+        self._head = bytearray() if self.encoding == "deflate" else None
+    
+    def decode(self, chunk: bytes) -> bytes:
+        """Décompresse un bloc reçu."""
+        if self._decompressor is None:
+            return chunk
+        if self.encoding == "br":
+            return self._decompressor.process(chunk)
+        if self._head is None:
+            return self._decompressor.decompress(chunk)
+        
+        self._head += chunk
+        try:
+            decoded = self._decompressor.decompress(chunk)
+        except zlib.error:
+            # deflate brut, sans en-tête zlib, envoyé par certains serveurs :
+            # tout ce qui a été reçu est redonné au décompresseur brut
+            self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            decoded = self._decompressor.decompress(bytes(self._head))
+            self._head = None
+            return decoded
+        # L'en-tête (2 octets) est vérifié dès qu'il est complet
+        if decoded or len(self._head) >= 2:
+            self._head = None
+        return decoded
+    
+    def flush(self) -> bytes:
+        """Octets restant dans le décompresseur en fin de flux."""
+        if self._decompressor is None or self.encoding == "br":
+            return b""
+        return self._decompressor.flush()
+
+
+# ----------------------------------------------------------------------------
+# Délais adaptatifs
+# ----------------------------------------------------------------------------
+
+class LatencyTracker:
+    """Latences récentes d'un point d'accès (réponses et délais dépassés)."""
+    
+    SAMPLES = 100
+    # Échantillons nécessaires avant d'adapter délais et secondes tentatives
+    MIN_SAMPLES = 20
+    
+    def __init__(self):
+        self._samples = deque(maxlen=self.SAMPLES)
+        self._sorted = None
+    
+    def __len__(self):
+        return len(self._samples)
+    
+    def add(self, duration: float):
+        self._samples.append(duration)
+        self._sorted = None
+    
+    def percentile(self, q: float):
+        """Quantile `q` (0 à 1) des latences, None tant que l'historique est trop court."""
+        if len(self._samples) < self.MIN_SAMPLES:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self._samples)
+        return self._sorted[min(int(q * len(self._sorted)), len(self._sorted) - 1)]
+
+
+class SwimoAPI:
+    """API client pour Swimo/Orkestron avec support WebSocket temps réel."""
+    
+    BASE_URL = "https://socket.swimo.io/cgi-bin"
+    SOCK_URL = "https://sock.swimo.io"
+    WSS_URL = "wss://now.swimo.io"
+    
+    # Délai maximal de fermeture (secondes)
+    CLOSE_TIMEOUT = 5
+    
+    # Délai initial de reconnexion WebSocket (secondes)
+    RECONNECT_DELAY = 5
+    
+    # Délai des commandes et plafond des délais adaptatifs de get_token et get_all (secondes)
+    REQUEST_TIMEOUT = 10
+    
+    # Plafond du délai des requêtes temps réel GET_SENSORS / GET_ACTIONS (secondes)
+    REALTIME_TIMEOUT = 5
+    
+    # Délai adaptatif des lectures : p99 observé x marge, plancher en secondes
+    TIMEOUT_MARGIN = 3
+    TIMEOUT_MIN = 2
+    
+    # Seconde tentative des lectures idempotentes après le p95, au plus tôt (secondes)
+    HEDGE_MIN_DELAY = 0.5
+    
+    # Relance des commandes en attente (secondes)
+    JOURNAL_RETRY_MIN = 5
+    JOURNAL_RETRY_MAX = 300
+    
+    def __init__(self, email: str, password: str, store=None):
+        self.email = email
+        self.password = password
+        self.token = None
+        self.token_expires = None
+        self._session = None
+        self._parser = SwimoParser()
+        self._data = SwimoData()
+        self._generation = 0
+        self._inflight = []
+        self._sio = None
+        self._callbacks = []
+        self._websocket_connected = False
+        self._tasks = set()
+        self._closing = False
+        self.request_timeout = self.REQUEST_TIMEOUT
+        self._latency = {}
+        self._hedge_limit = None
+        self._reconnect_delay = self.RECONNECT_DELAY
+        
+        # Compteurs internes (exportés en OpenMetrics)
+        self.request_stats = {}
+        self.push_stats = {}
+        self.websocket_connections = 0
+        self.token_obtained_at = None
+        self.push_dropped = {}
+        self._recorder = None
+        self._changed_records = set()
+        self._event_digests = {}
+        self._frame_digests = {}
+        self._journal = CommandJournal(store)
+        self._journal_task = None
+        self._journal_lock = asyncio.Lock()
+    
+    async def _get_session(self):
+        """Récupère ou crée une session aiohttp."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+    
+    def create_background_task(self, coro, name: str = None) -> asyncio.Task:
+        """Lance une tâche de fond possédée par le client, annulée par close()."""
+        task = asyncio.get_running_loop().create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+    
+    async def close(self, timeout: float = None):
+        """Ferme les connexions et annule les tâches de fond, en au plus `timeout` secondes."""
+        timeout = self.CLOSE_TIMEOUT if timeout is None else timeout
+        self._closing = True
+        self._callbacks.clear()
+        
+        tasks = [task for task in self._tasks if not task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            _, still_running = await asyncio.wait(tasks, timeout=timeout)
+            if still_running:
+                _LOGGER.warning(f"{len(still_running)} tâche(s) Swimo non terminée(s) après {timeout} s")
+        
+        await self._stop_websocket(timeout)
+        
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def stop_websocket(self):
+        """Arrête le WebSocket : les données ne proviennent plus que des interrogations."""
+        if self._sio is None:
+            return
+        await self._stop_websocket(self.CLOSE_TIMEOUT)
+        self._changed_records.add(WEBSOCKET_KEY)
+        _LOGGER.info("WebSocket Swimo arrêté")
+    
+    def set_reconnect_delay(self, delay: float):
+        """Délai initial de reconnexion WebSocket, appliqué aussi au client en cours."""
+        self._reconnect_delay = delay
+        if self._sio is not None:
+            self._sio.reconnection_delay = delay
+    
+    async def _stop_websocket(self, timeout: float):
+        """Arrête le client Socket.IO, y compris sa boucle de reconnexion."""
+        sio, self._sio = self._sio, None
+        self._websocket_connected = False
+        if sio is None:
+            return
+        
+        # Empêche toute nouvelle tentative de reconnexion
+        sio.reconnection = False
+        try:
+            shutdown = getattr(sio, "shutdown", None)
+            await asyncio.wait_for(shutdown() if shutdown else sio.disconnect(), timeout)
+        except Exception as e:
+            _LOGGER.debug(f"Erreur déconnexion WebSocket: {e}")
+    
+    @contextmanager
+    def _measure(self, endpoint: str):
+        """Mesure la durée et l'issue d'une requête HTTP.
+        
+        Les réponses et les délais dépassés alimentent la latence du point
+        d'accès ; une tentative annulée (tentative devancée, fermeture) n'est
+        pas comptée ici, `_hedged` enregistre la durée de la perdante.
+        """
+        stats = self.request_stats.setdefault(
+            endpoint, {"count": 0, "errors": 0, "duration": 0.0, "bytes": 0, "decoded_bytes": 0, "hedged": 0,
+                       "hedge_skipped": 0},
+        )
+        outcome = {"ok": True}
+        start = time.monotonic()
+        try:
+            yield outcome
+        except asyncio.CancelledError:
+            outcome["cancelled"] = True
+            raise
+        except asyncio.TimeoutError:
+            outcome["ok"] = False
+            outcome["timeout"] = True
+            raise
+        except BaseException:
+            outcome["ok"] = False
+            raise
+        finally:
+            duration = time.monotonic() - start
+            if not outcome.get("cancelled"):
+                stats["count"] += 1
+                stats["duration"] += duration
+                if not outcome["ok"]:
+                    stats["errors"] += 1
+                if outcome["ok"] or outcome.get("timeout"):
+                    self._latency.setdefault(endpoint, LatencyTracker()).add(duration)
+    
+    def timeout_for(self, endpoint: str, ceiling: float) -> float:
+        """Délai d'une lecture : p99 observé avec une marge, borné par `ceiling`."""
+        tracker = self._latency.get(endpoint)
+        p99 = tracker.percentile(0.99) if tracker else None
+        if p99 is None:
+            return ceiling
+        return round(min(ceiling, max(self.TIMEOUT_MIN, p99 * self.TIMEOUT_MARGIN)), 3)
+    
+    def hedge_delay(self, endpoint: str):
+        """Attente avant une seconde tentative (p95 observé), None sans historique suffisant."""
+        tracker = self._latency.get(endpoint)
+        p95 = tracker.percentile(0.95) if tracker else None
+        if p95 is None:
+            return None
+        return max(self.HEDGE_MIN_DELAY, p95)
+    
+    def latency_stats(self) -> dict:
+        """Quantiles de latence et délai courant par point d'accès (secondes)."""
+        return {
+            endpoint: {
+                "samples": len(tracker),
+                "p50": tracker.percentile(0.5),
+                "p95": tracker.percentile(0.95),
+                "p99": tracker.percentile(0.99),
+            }
+            for endpoint, tracker in self._latency.items()
+        }
+    
+    def set_hedge_limit(self, limit):
+        """Limite de concurrence des secondes tentatives.
+        
+        `limit` retourne le sémaphore à occuper (celui du planificateur
+        partagé entre entrées) : la seconde tentative prend une place en
+        plus de celle de la requête d'origine, et n'est pas lancée si
+        aucune place n'est libre.
+        """
+        self._hedge_limit = limit
+    
+    async def _hedged(self, endpoint: str, attempt):
+        """Exécute une lecture idempotente, relancée en parallèle si elle dépasse le p95.
+        
+        La première réponse valide l'emporte et l'autre tentative est
+        annulée. Si les deux échouent, l'échec de la première est remonté.
+        La durée écoulée de la tentative annulée est enregistrée comme
+        latence (borne inférieure) : sans elle, les échantillons les plus
+        lents disparaîtraient dès les premières secondes tentatives.
+        """
+        first = asyncio.ensure_future(attempt())
+        tasks = [first]
+        started = {first: time.monotonic()}
+        abandoned = False
+        try:
+            delay = self.hedge_delay(endpoint)
+            if delay is None:
+                return await first
+            
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return first.result()
+            
+            limit = self._hedge_limit() if self._hedge_limit else None
+            if limit is not None and limit.locked():
+                # Limite globale atteinte : pas de requête supplémentaire
+                self.request_stats[endpoint]["hedge_skipped"] += 1
+                return await first
+            
+            async def hedge():
+                if limit is None:
+                    return await attempt()
+                async with limit:
+                    return await attempt()
+            
+            self.request_stats[endpoint]["hedged"] += 1
+            _LOGGER.debug(f"{endpoint}: pas de réponse après {delay:.2f} s, seconde tentative")
+            tasks.append(asyncio.ensure_future(hedge()))
+            started[tasks[-1]] = time.monotonic()
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and task.result() is not None:
+                        return task.result()
+            return first.result()
+        except asyncio.CancelledError:
+            abandoned = True
+            raise
+        finally:
+            running = [task for task in tasks if not task.done()]
+            now = time.monotonic()
+            for task in running:
+                task.cancel()
+                if not abandoned:
+                    self._latency.setdefault(endpoint, LatencyTracker()).add(now - started[task])
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+            for task in tasks:
+                if not task.cancelled():
+                    # Échec d'une tentative devancée par l'autre : rien à remonter
+                    task.exception()
+    
+    async def get_token(self) -> str:
+        """Obtient un token valide."""
+        if self.token and self.token_expires and datetime.now() < self.token_expires:
+            return self.token
+        
+        session = await self._get_session()
+        headers = {
+            "user": self.email,
+            "code": self.password
+        }
+        
+        try:
+            with self._measure("get_token") as outcome:
+                async with session.get(
+                    f"{self.BASE_URL}/get_token",
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=self.timeout_for("get_token", self.request_timeout))
+                ) as response:
+                    outcome["ok"] = response.status == 200
+                    if response.status == 200:
+                        data = await response.json()
+                        self.token = data.get("token") or data.get("appid")
+                        self.token_expires = datetime.now() + timedelta(days=29)
+                        self.token_obtained_at = time.time()
+                        _LOGGER.info("Token Swimo obtenu avec succès")
+                        return self.token
+                    else:
+                        text = await response.text()
+                        _LOGGER.error(f"Erreur {response.status}: {text}")
+                        return None
+        except Exception as e:
+            _LOGGER.error(f"Exception lors de l'obtention du token: {e}")
+            return None
+    
+    async def get_all_data(self) -> SwimoData:
+        """Récupère toutes les données du système.
+        
+        Seuls les champs typés sont conservés : la réponse brute n'est pas
+        gardée en mémoire (voir get_raw_data pour les diagnostics).
+        """
+        # Trames reçues pendant la requête : plus récentes que sa réponse
+        overlay = {}
+        self._inflight.append(overlay)
+        try:
+            data = await self._fetch_all()
+            if data is None:
+                return self._data
+            if self._recorder:
+                self._recorder.record_snapshot(data)
+            self.load_snapshot(data, overlay)
+        finally:
+            self._inflight.remove(overlay)
+        
+        if self._journal.pending and self._journal.reconcile(self._data):
+            await self._journal.async_save()
+        _LOGGER.debug(f"Données récupérées: {len(self._data.sensors)} capteurs")
+        return self._data
+    
+    async def get_raw_data(self) -> dict:
+        """Réponse get_all brute, récupérée à la demande (diagnostics)."""
+        return await self._fetch_all() or {}
+    
+    async def _fetch_all(self):
+        """Requête get_all : réponse JSON décodée, ou None en cas d'échec."""
+        token = await self.get_token()
+        if not token:
+            _LOGGER.error("Impossible d'obtenir un token valide")
+            return None
+        
+        session = await self._get_session()
+        headers = {"appid": token, "Accept-Encoding": ACCEPT_ENCODING}
+        
+        async def attempt():
+            with self._measure("get_all") as outcome:
+                async with session.get(
+                    f"{self.BASE_URL}/get_all",
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=self.timeout_for("get_all", self.request_timeout)),
+                    auto_decompress=False,
+                ) as response:
+                    outcome["ok"] = response.status == 200
+                    if response.status == 200:
+                        return await self._read_json(response, "get_all")
+                    else:
+                        text = await self._read_error(response, "get_all")
+                        _LOGGER.error(f"Erreur {response.status}: {text}")
+                        return None
+        
+        try:
+            return await self._hedged("get_all", attempt)
+        except asyncio.TimeoutError:
+            _LOGGER.error("Timeout lors de la récupération des données")
+            return None
+        except Exception as e:
+            _LOGGER.error(f"Exception lors de la récupération: {e}")
+            return None
+    
+    async def _read_json(self, response, endpoint: str):
+        """Décompresse le corps au fil du flux puis le décode en JSON."""
+        return json.loads(await self._read_body(response, endpoint))
+    
+    async def _read_error(self, response, endpoint: str) -> str:
+        """Corps d'une réponse d'erreur, décompressé comme une réponse valide.
+        
+        Un corps illisible est signalé sans masquer le statut HTTP.
+        """
+        try:
+            return (await self._read_body(response, endpoint)).decode(errors="replace")
+        except Exception as e:
+            return f"corps illisible ({response.headers.get('Content-Encoding')}: {e})"
+    
+    async def _read_body(self, response, endpoint: str) -> bytes:
+        """Décompresse le corps au fil du flux.
+        
+        Les octets reçus (compressés) et décompressés sont comptés dans
+        request_stats[endpoint].
+        """
+        decoder = StreamDecoder(response.headers.get("Content-Encoding"))
+        body = bytearray()
+        received = 0
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            received += len(chunk)
+            body += decoder.decode(chunk)
+        body += decoder.flush()
+        
+        stats = self.request_stats[endpoint]
+        stats["bytes"] += received
+        stats["decoded_bytes"] += len(body)
+        _LOGGER.debug(f"{endpoint}: {received} octets reçus ({decoder.encoding}), {len(body)} décompressés")
+        return bytes(body)
+    
+    async def update_device(self, key: str, value: str, number: int = None) -> bool:
+        """Met à jour un appareil ou paramètre.
+        
+        La commande est inscrite au journal avant l'envoi : en cas de coupure
+        elle est relancée en arrière-plan jusqu'à son envoi ou son
+        remplacement. Retourne True si elle a été acceptée immédiatement.
+        """
+        command = self._journal.add(key, value, number)
+        await self._drain_journal()
+        return command.get("accepted", False)
+    
+    async def apply_changes(self, changes: list) -> dict:
+        """Envoie une série de commandes (key, value, number) dans l'ordre.
+        
+        Les commandes passent par le journal comme pour update_device ;
+        celles qui ne peuvent être envoyées restent en attente. Retourne le
+        nombre de commandes envoyées, rejetées et en attente.
+        """
+        for change in changes:
+            self._journal.add(change["key"], str(change["value"]), change.get("number"))
+        return await self._drain_journal()
+    
+    async def _drain_journal(self) -> dict:
+        """Envoie les commandes en attente dans l'ordre, jusqu'à la première erreur transitoire."""
+        results = {"sent": 0, "rejected": 0}
+        async with self._journal_lock:
+            while self._journal.pending:
+                command = self._journal.pending[0]
+                result = await self._send_command(command)
+                if result is None:
+                    break
+                results["sent" if result else "rejected"] += 1
+            await self._journal.async_save()
+        
+        results["pending"] = len(self._journal.pending)
+        if self._journal.pending:
+            _LOGGER.info(f"{results['pending']} commande(s) en attente de renvoi")
+            self._schedule_journal_replay()
+        return results
+    
+    async def _send_command(self, command: dict):
+        """Envoie une commande du journal.
+        
+        Retourne True si elle est acceptée, False si elle est rejetée
+        (retirée du journal), None sur une erreur transitoire (conservée).
+        """
+        key, value, number = command["key"], command["value"], command["number"]
+        command["attempts"] += 1
+        
+        token = await self.get_token()
+        if not token:
+            return None
+        
+        session = await self._get_session()
+        headers = {"appid": token}
+        params = {"key": key, "value": value}
+        
+        if number is not None:
+            params["number"] = number
+        
+        try:
+            with self._measure("update_all") as outcome:
+                async with session.get(
+                    f"{self.BASE_URL}/update_all",
+                    headers=headers,
+                    params=params,
+                    timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+                ) as response:
+                    outcome["ok"] = response.status == 200
+                    if response.status >= 500:
+                        _LOGGER.warning(f"Échec mise à jour {key}={value} ({response.status}), nouvel essai prévu")
+                        return None
+                    success = response.status == 200
+                    if success:
+                        _LOGGER.info(f"Mise à jour réussie: {key}={value}")
+                    else:
+                        _LOGGER.error(f"Échec mise à jour: {response.status}")
+        except Exception as e:
+            _LOGGER.warning(f"Exception lors de la mise à jour {key}={value}, nouvel essai prévu: {e}")
+            return None
+        
+        command["accepted"] = success
+        self._journal.remove(command)
+        return success
+    
+    def _schedule_journal_replay(self):
+        """Lance la relance du journal si elle n'est pas déjà en cours."""
+        if self._closing:
+            return
+        if self._journal_task is None or self._journal_task.done():
+            self._journal_task = self.create_background_task(self._replay_journal(), name="swimo_journal")
+    
+    async def _replay_journal(self):
+        """Relance les commandes en attente, dans l'ordre, avec un délai croissant."""
+        delay = self.JOURNAL_RETRY_MIN
+        while self._journal.pending:
+            await asyncio.sleep(delay)
+            self._journal.drop_expired()
+            await self._drain_journal()
+            delay = min(delay * 2, self.JOURNAL_RETRY_MAX)
+        _LOGGER.debug("Journal des commandes vidé")
+    
+    async def async_load_journal(self):
+        """Recharge le journal persisté et relance les commandes en attente."""
+        await self._journal.async_load()
+        if self._journal.pending:
+            self._schedule_journal_replay()
+    
+    def pending_commands(self) -> list:
+        """Retourne les commandes en attente d'envoi."""
+        return list(self._journal.pending)
+    
+    async def get_sensors_realtime(self) -> dict:
+        """Récupère les données des capteurs en temps réel via POST."""
+        token = await self.get_token()
+        if not token:
+            return {}
+        
+        session = await self._get_session()
+        
+        async def attempt():
+            with self._measure("get_sensors") as outcome:
+                async with session.post(
+                    self.SOCK_URL,
+                    json={"appid": token, "type": "GET_SENSORS"},
+                    headers={"Content-Type": "application/json"},
+                    timeout=aiohttp.ClientTimeout(total=self.timeout_for("get_sensors", self.REALTIME_TIMEOUT))
+                ) as response:
+                    outcome["ok"] = response.status == 200
+                    if response.status == 200:
+                        return await response.json()
+                    return None
+        
+        try:
+            return await self._hedged("get_sensors", attempt) or {}
+        except Exception as e:
+            _LOGGER.debug(f"Erreur temps réel capteurs: {e}")
+        
+        return {}
+    
+    async def get_actions_realtime(self) -> dict:
+        """Récupère l'état des actions en temps réel."""
+        token = await self.get_token()
+        if not token:
+            return {}
+        
+        session = await self._get_session()
+        
+        async def attempt():
+            with self._measure("get_actions") as outcome:
+                async with session.post(
+                    self.SOCK_URL,
+                    json={"appid": token, "type": "GET_ACTIONS"},
+                    headers={"Content-Type": "application/json"},
+                    timeout=aiohttp.ClientTimeout(total=self.timeout_for("get_actions", self.REALTIME_TIMEOUT))
+                ) as response:
+                    outcome["ok"] = response.status == 200
+                    if response.status == 200:
+                        return await response.json()
+                    return None
+        
+        try:
+            return await self._hedged("get_actions", attempt) or {}
+        except Exception as e:
+            _LOGGER.debug(f"Erreur temps réel actions: {e}")
+        
+        return {}
+    
+    def load_snapshot(self, data: dict, overlay: dict = None) -> SwimoData:
+        """Remplace les données courantes par une réponse get_all.
+        
+        `overlay` porte les changements poussés pendant la requête ({clé:
+        champs}), réappliqués sur les enregistrements de la réponse.
+        """
+        previous = self._data
+        parsed = self._parser.parse_snapshot(data)
+        
+        if overlay:
+            collections = {"sensors": dict(parsed.sensors), "actions": dict(parsed.actions)}
+            for (kind, number), (record, changes) in overlay.items():
+                collection = collections[f"{kind}s"]
+                current = collection.get(number)
+                collection[number] = replace(current, **changes) if current is not None else record
+            parsed = replace(parsed, **collections)
+        
+        # Copie sur écriture : un enregistrement égal au précédent est
+        # réutilisé, et une collection inchangée est partagée telle quelle
+        shared = {}
+        for name in ("sensors", "devices", "actions", "alarms"):
+            old, new = getattr(previous, name), getattr(parsed, name)
+            merged = {
+                number: old[number] if old.get(number) == record else record
+                for number, record in new.items()
+            }
+            unchanged = merged.keys() == old.keys() and all(merged[n] is old[n] for n in merged)
+            shared[name] = old if unchanged else merged
+        if parsed.system == previous.system:
+            shared["system"] = previous.system
+        
+        self._generation += 1
+        self._data = replace(parsed, generation=self._generation, **shared)
+        
+        # Une trame identique à la dernière reçue redevient significative
+        # si le snapshot a modifié son enregistrement entre-temps
+        self._frame_digests = {
+            key: digest for key, digest in self._frame_digests.items()
+            if previous.get(key) == self._data.get(key)
+        }
+        return self._data
+    
+    @property
+    def data(self) -> SwimoData:
+        """Snapshot typé courant."""
+        return self._data
+    
+    @property
+    def parser_rejected(self) -> dict:
+        """Nombre d'enregistrements écartés par le parseur, par type."""
+        return self._parser.rejected
+    
+    def set_recorder(self, recorder):
+        """Active (ou désactive avec None) l'enregistrement des réponses et événements."""
+        self._recorder = recorder
+    
+    def get_sensors(self) -> list:
+        """Retourne la liste des capteurs."""
+        return list(self._data.sensors.values())
+    
+    def get_devices(self) -> list:
+        """Retourne la liste des appareils."""
+        return list(self._data.devices.values())
+    
+    def get_actions(self) -> list:
+        """Retourne la liste des actions."""
+        return list(self._data.actions.values())
+    
+    def get_system_info(self) -> SystemRecord:
+        """Retourne les informations système."""
+        return self._data.system
+    
+    async def start_websocket(self, callback=None):
+        """Démarre la connexion WebSocket temps réel."""
+        if self._websocket_connected:
+            _LOGGER.debug("WebSocket déjà connecté")
+            return True
+        
+        token = await self.get_token()
+        if not token:
+            _LOGGER.error("Impossible de démarrer WebSocket sans token")
+            return False
+        
+        if callback:
+            self.register_callback(callback)
+        
+        # Un client précédent (connexion échouée) ne doit pas continuer à se reconnecter
+        await self._stop_websocket(self.CLOSE_TIMEOUT)
+        
+        try:
+            # Créer le client SocketIO
+            self._sio = socketio.AsyncClient(
+                logger=False,
+                engineio_logger=False,
+                reconnection=True,
+                reconnection_attempts=0,  # Tentatives infinies
+                reconnection_delay=self._reconnect_delay,
+                reconnection_delay_max=30,
+                # Délais de reconnexion aléatoires : pas de reconnexions synchronisées après une panne
+                randomization_factor=0.5,
+            )
+            
+            # Gestionnaires d'événements
+            @self._sio.event
+            async def connect():
+                """Connexion établie."""
+                _LOGGER.info("WebSocket Swimo connecté")
+                self._websocket_connected = True
+                self.websocket_connections += 1
+                self._changed_records.add(WEBSOCKET_KEY)
+                await self._notify_callbacks({"type": "connection", "connected": True})
+                
+                # Authentification
+                await self._sio.emit("authenticate", {"appid": token})
+            
+            @self._sio.event
+            async def disconnect():
+                """Déconnexion."""
+                _LOGGER.warning("WebSocket Swimo déconnecté")
+                self._websocket_connected = False
+                self._changed_records.add(WEBSOCKET_KEY)
+                await self._notify_callbacks({"type": "connection", "connected": False})
+            
+            @self._sio.event
+            async def authentication(data):
+                """Réponse d'authentification."""
+                _LOGGER.info(f"WebSocket authentifié: {data}")
+            
+            @self._sio.event
+            async def data(raw_data):
+                """Données reçues - format complet toutes les 10 minutes."""
+                await self.handle_event("data", raw_data)
+            
+            @self._sio.event
+            async def sensors_data(raw_data):
+                """Mise à jour d'un capteur spécifique."""
+                await self.handle_event("sensors_data", raw_data)
+            
+            @self._sio.event
+            async def actions_status_data(raw_data):
+                """Mise à jour du statut des actions."""
+                await self.handle_event("actions_status_data", raw_data)
+            
+            # Connexion au WebSocket
+            _LOGGER.info(f"Connexion au WebSocket: {self.WSS_URL}")
+            await self._sio.connect(
+                self.WSS_URL,
+                transports=['websocket'],
+                wait_timeout=10
+            )
+            
+            return True
+            
+        except Exception as e:
+            _LOGGER.error(f"Erreur démarrage WebSocket: {e}")
+            self._websocket_connected = False
+            return False
+    
+    async def handle_event(self, event: str, raw_data):
+        """Traite un événement temps réel, reçu du WebSocket ou rejoué depuis une capture."""
+        if self._recorder:
+            self._recorder.record_event(event, raw_data)
+        self.push_stats[event] = self.push_stats.get(event, 0) + 1
+        
+        # La trame complète périodique répète le plus souvent la précédente ;
+        # elle n'est écartée que si aucun snapshot n'a été publié depuis
+        digest = self._digest(raw_data)
+        if self._event_digests.get(event) == (digest, self._generation):
+            self._drop("duplicate_frame")
+            return
+        
+        try:
+            if isinstance(raw_data, str):
+                data = json.loads(raw_data)
+            else:
+                data = raw_data
+            
+            _LOGGER.debug(f"WebSocket {event}: {data.get('type') if event == 'data' else data}")
+            
+            if event == "data":
+                # Mise à jour des capteurs et des actions
+                if data.get("type") == "data" and "sensors" in data:
+                    await self._update_sensors(data["sensors"])
+                if data.get("type") == "data" and "actions" in data:
+                    await self._update_actions(data["actions"])
+            elif event == "sensors_data":
+                if "sensors" not in data:
+                    return
+                await self._update_sensors(data["sensors"])
+            elif event == "actions_status_data":
+                if "actions" not in data:
+                    return
+                await self._update_actions(data["actions"])
+            else:
+                _LOGGER.debug(f"Événement WebSocket ignoré: {event}")
+                return
+            
+            self._event_digests[event] = (digest, self._generation)
+            await self._notify_callbacks(data)
+        
+        except Exception as e:
+            _LOGGER.error(f"Erreur traitement {event} WebSocket: {e}")
+    
+    async def _notify_callbacks(self, data):
+        """Notifie les callbacks enregistrés."""
+        for cb in self._callbacks:
+            try:
+                await cb(data)
+            except Exception as e:
+                _LOGGER.error(f"Erreur callback: {e}")
+    
+    async def _update_sensors(self, sensors_data):
+        """Met à jour les données des capteurs depuis le WebSocket."""
+        updates = {}
+        for sensor_update in sensors_data:
+            frame = self._parser.parse_sensor_frame(sensor_update)
+            if frame is None:
+                continue
+            sensor_num, changes = frame
+            
+            # Si non trouvé, l'ajouter sans jamais remplacer un autre capteur de même numéro
+            sensor = self._data.find_sensor(sensor_num)
+            if sensor is None:
+                if sensor_num in self._data.sensors:
+                    _LOGGER.debug(f"Trame capteur ignorée : aucun capteur d'index {sensor_num}")
+                    self._drop("unknown_sensor")
+                    continue
+                sensor = updates.get(sensor_num) or SensorRecord(number=sensor_num, index=sensor_num)
+            else:
+                sensor = updates.get(sensor.number, sensor)
+            
+            if self._accept_frame(sensor, sensor_update, changes):
+                self._store(updates, self._data.sensors, sensor, changes)
+        self._publish("sensors", updates)
+    
+    async def _update_actions(self, actions_data):
+        """Met à jour les données des actions depuis le WebSocket."""
+        updates = {}
+        for action_update in actions_data:
+            frame = self._parser.parse_action_frame(action_update)
+            if frame is None:
+                continue
+            action_num, changes = frame
+            
+            # Si non trouvée, l'ajouter
+            action = updates.get(action_num) or self._data.actions.get(action_num)
+            if action is None:
+                action = ActionRecord(number=action_num)
+            
+            if self._accept_frame(action, action_update, changes):
+                self._store(updates, self._data.actions, action, changes)
+        self._publish("actions", updates)
+    
+    def _accept_frame(self, record, update: dict, changes: dict) -> bool:
+        """Écarte une trame déjà appliquée ou plus ancienne que l'enregistrement."""
+        digest = self._digest(update)
+        if self._frame_digests.get(record.key) == digest:
+            self._drop("duplicate")
+            return False
+        updated = changes.get("updated")
+        if updated is not None and record.updated is not None and updated < record.updated:
+            self._drop("stale")
+            return False
+        self._frame_digests[record.key] = digest
+        return True
+    
+    @staticmethod
+    def _digest(data) -> int:
+        """Empreinte du contenu d'une trame."""
+        if isinstance(data, str):
+            return hash(data)
+        return hash(json.dumps(data, sort_keys=True, default=str))
+    
+    def _drop(self, reason: str):
+        self.push_dropped[reason] = self.push_dropped.get(reason, 0) + 1
+    
+    def _store(self, updates: dict, collection, record, changes: dict):
+        """Prépare la version modifiée d'un enregistrement si l'un des champs a changé."""
+        updated = replace(record, **changes)
+        if updated != record or record.number not in collection:
+            updates[record.number] = updated
+            self._changed_records.add(updated.key)
+        elif updated.updated != record.updated:
+            # Horodatage seul : conservé pour écarter les trames plus anciennes, sans notification
+            updates[record.number] = updated
+        else:
+            return
+        for overlay in self._inflight:
+            _, merged = overlay.get(updated.key, (None, {}))
+            overlay[updated.key] = (updated, {**merged, **changes})
+    
+    def _publish(self, name: str, updates: dict):
+        """Publie un nouveau snapshot : seule la collection modifiée est copiée."""
+        if not updates:
+            return
+        self._generation += 1
+        self._data = replace(
+            self._data,
+            generation=self._generation,
+            **{name: {**getattr(self._data, name), **updates}},
+        )
+    
+    def pop_changed_records(self) -> set:
+        """Retourne et réinitialise les clés des enregistrements modifiés par le WebSocket."""
+        changed = self._changed_records
+        self._changed_records = set()
+        return changed
+    
+    def is_websocket_connected(self) -> bool:
+        """Vérifie si le WebSocket est connecté."""
+        return self._websocket_connected
+    
+    def register_callback(self, callback):
+        """Enregistre un callback pour les mises à jour WebSocket."""
+        if callback not in self._callbacks:
+            self._callbacks.append(callback)
+    
+    def unregister_callback(self, callback):
+        """Retire un callback enregistré."""
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
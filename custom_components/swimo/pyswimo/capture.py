@@ -0,0 +1,134 @@
+# ============================================================================
+# capture.py - Enregistrement et rejeu des flux Swimo
+# ============================================================================
+"""Enregistrement et rejeu des réponses get_all et des événements WebSocket.
+
+Une capture est un fichier JSONL compressé en gzip : une ligne d'en-tête
+puis un enregistrement par réponse ou événement, horodaté en secondes
+depuis le début de la capture.
+"""
+import asyncio
+import gzip
+import json
+import logging
+import time
+from datetime import datetime
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_VERSION = 1
+
+KIND_META = "meta"
+KIND_SNAPSHOT = "get_all"
+KIND_EVENT = "event"
+
+
+class CaptureWriter:
+    """Écrit une capture JSONL compressée."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._start = time.monotonic()
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._write({
+            "k": KIND_META,
+            "v": CAPTURE_VERSION,
+            "start": datetime.now().isoformat(),
+        })
+
+    def _write(self, record: dict):
+        """Écrit une ligne compacte."""
+        self._file.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False))
+        self._file.write("\n")
+
+    def _elapsed(self) -> float:
+        return round(time.monotonic() - self._start, 3)
+
+    def record_snapshot(self, data):
+        """Enregistre une réponse get_all."""
+        self._write({"t": self._elapsed(), "k": KIND_SNAPSHOT, "d": data})
+        self.count += 1
+
+    def record_event(self, event: str, data):
+        """Enregistre un événement WebSocket brut."""
+        self._write({"t": self._elapsed(), "k": KIND_EVENT, "e": event, "d": data})
+        self.count += 1
+
+    def close(self):
+        """Ferme le fichier de capture."""
+        if not self._file.closed:
+            self._file.close()
+
+
+def read_capture(path: str):
+    """Itère sur les enregistrements d'une capture (en-tête exclu)."""
+    with gzip.open(path, "rt", encoding="utf-8") as capture:
+        for line_num, line in enumerate(capture, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                _LOGGER.warning(f"Ligne {line_num} de la capture illisible, ignorée")
+                continue
+            if record.get("k") == KIND_META:
+                if record.get("v") != CAPTURE_VERSION:
+                    _LOGGER.warning(f"Version de capture inattendue: {record.get('v')}")
+                continue
+            yield record
+
+
+class CaptureReplayer:
+    """Rejoue une capture dans un SwimoAPI.
+
+    Les événements passent par `SwimoAPI.handle_event` et déclenchent donc
+    les callbacks enregistrés (coordinateur et entités dans Home Assistant).
+    `on_snapshot` reçoit les données après chaque réponse get_all rejouée.
+    Une vitesse de 0 rejoue la capture aussi vite que possible, en rendant
+    la main à la boucle après chaque enregistrement.
+    """
+
+    def __init__(self, api, speed: float = 1.0, on_snapshot=None):
+        self._api = api
+        self._speed = speed
+        self._on_snapshot = on_snapshot
+
+    async def run(self, path: str) -> dict:
+        """Rejoue la capture et retourne les statistiques du rejeu."""
+        return await self.run_records(read_capture(path))
+
+    async def run_records(self, records) -> dict:
+        """Rejoue des enregistrements déjà lus (lecture du fichier hors de la boucle)."""
+        stats = {"snapshots": 0, "events": 0, "capture_duration": 0.0}
+        start = time.monotonic()
+
+        for record in records:
+            offset = record.get("t", 0)
+            if self._speed > 0:
+                delay = offset / self._speed - (time.monotonic() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            kind = record.get("k")
+            if kind == KIND_SNAPSHOT:
+                data = self._api.load_snapshot(record.get("d") or {})
+                if self._on_snapshot:
+                    result = self._on_snapshot(data)
+                    if asyncio.iscoroutine(result):
+                        await result
+                stats["snapshots"] += 1
+            elif kind == KIND_EVENT:
+                await self._api.handle_event(record.get("e"), record.get("d"))
+                stats["events"] += 1
+
+            stats["capture_duration"] = offset
+            # Rend la main à la boucle : diffusions regroupées et autres tâches
+            await asyncio.sleep(0)
+
+        duration = time.monotonic() - start
+        frames = stats["snapshots"] + stats["events"]
+        stats["duration"] = round(duration, 3)
+        stats["frames_per_second"] = round(frames / duration, 1) if duration > 0 else 0.0
+        return stats
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Ligne de commande du client Swimo, sans Home Assistant.
+
+Les commandes passent par les mêmes chemins que l'intégration (SwimoAPI,
+parseur, journal des commandes, WebSocket) :
+
+    python -m pyswimo watch                      suit les changements (poll + WebSocket)
+    python -m pyswimo get --kind sensor          affiche le snapshot courant
+    python -m pyswimo set action_mode 3 1        envoie une commande
+    python -m pyswimo bench [capture.jsonl.gz]   mesure parseur, diff et trames poussées
+    python -m pyswimo record -d 600 -o capture.jsonl.gz
+                                                 enregistre get_all et le WebSocket
+    python -m pyswimo replay capture.jsonl.gz --speed 10
+                                                 rejoue une capture (0 = au plus vite)
+    python -m pyswimo reload --cycles 20         cycles ouverture/fermeture du client
+                                                 (pas de l'entrée HA), vérifie l'absence de fuite
+
+Identifiants : --email/--password ou variables SWIMO_EMAIL/SWIMO_PASSWORD.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from .api import SwimoAPI, SwimoParser, check_change, record_to_dict
+from .capture import CaptureReplayer, CaptureWriter, KIND_EVENT, KIND_SNAPSHOT, read_capture
+
+
+def describe(record) -> str:
+    """Résumé d'une ligne d'un enregistrement."""
+    values = record_to_dict(record)
+    name = values.pop("name", None) or values.get("number", "")
+    if "value" in values or "value_text" in values:
+        value = values.get("value", values.get("value_text"))
+        return f"{name} = {value} {values.get('unit') or ''}".rstrip()
+    shown = ("status", "mode", "speed", "setpoint", "volume")
+    return f"{name} " + " ".join(f"{field}={values[field]}" for field in shown if field in values)
+
+
+def _print_records(records: dict, source: str, as_json: bool):
+    """Affiche des enregistrements {clé: enregistrement}."""
+    stamp = datetime.now().strftime("%H:%M:%S")
+    for key, record in sorted(records.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+        if record is None:
+            continue
+        topic = key[0] if key[1] is None else f"{key[0]}/{key[1]}"
+        if as_json:
+            print(json.dumps({"t": stamp, "source": source, "key": topic, **record_to_dict(record)},
+                             ensure_ascii=False, default=str))
+        else:
+            print(f"{stamp} {source:<4} {topic:<12} {describe(record)}")
+
+
+async def watch(email, password, poll_interval, websocket, as_json):
+    """Affiche chaque enregistrement modifié, qu'il vienne d'un poll ou du WebSocket."""
+    api = SwimoAPI(email, password)
+
+    async def on_push(data):
+        keys = api.pop_changed_records()
+        _print_records({key: api.data.get(key) for key in keys if key[1] is not None}, "push", as_json)
+
+    try:
+        data = await api.get_all_data()
+        if not data:
+            print("❌ Aucune donnée get_all, vérifiez vos identifiants", file=sys.stderr)
+            return 1
+        _print_records(data.records(), "poll", as_json)
+
+        if websocket and not await api.start_websocket(callback=on_push):
+            print("⚠️  WebSocket indisponible, suivi par polling seul", file=sys.stderr)
+
+        while True:
+            await asyncio.sleep(poll_interval)
+            previous = api.data.records()
+            current = (await api.get_all_data()).records()
+            api.pop_changed_records()
+            _print_records({key: record for key, record in current.items() if previous.get(key) != record}, "poll", as_json)
+    finally:
+        await api.close()
+
+
+async def get(email, password, kind, as_json, raw):
+    """Affiche le snapshot courant."""
+    api = SwimoAPI(email, password)
+    try:
+        if raw:
+            payload = await api.get_raw_data()
+            if not payload:
+                print("❌ Aucune donnée get_all, vérifiez vos identifiants", file=sys.stderr)
+                return 1
+            print(json.dumps(payload, indent=2, ensure_ascii=False))
+            return 0
+        data = await api.get_all_data()
+        if not data:
+            print("❌ Aucune donnée get_all, vérifiez vos identifiants", file=sys.stderr)
+            return 1
+        records = {key: record for key, record in data.records().items() if kind is None or key[0] == kind}
+        _print_records(records, "get", as_json)
+        if api.parser_rejected:
+            print(f"⚠️  Enregistrements écartés par le parseur : {api.parser_rejected}", file=sys.stderr)
+        return 0
+    finally:
+        await api.close()
+
+
+async def set_value(email, password, key, number, value):
+    """Valide puis envoie une commande, comme le service swimo.apply."""
+    api = SwimoAPI(email, password)
+    try:
+        data = await api.get_all_data()
+        try:
+            check_change(data, {"key": key, "value": value, "number": number})
+        except ValueError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 2
+
+        accepted = await api.update_device(key, value, number)
+        if accepted:
+            print(f"✅ {key} #{number} = {value}")
+            return 0
+        if api.pending_commands():
+            # Erreur transitoire : la commande reste au journal, non persisté en CLI
+            print(f"⚠️  {key} #{number} non confirmée (erreur transitoire), commande perdue à la sortie", file=sys.stderr)
+        else:
+            print(f"❌ {key} #{number} rejetée", file=sys.stderr)
+        return 1
+    finally:
+        await api.close()
+
+
+def _synthetic_payload(sensors: int, actions: int) -> dict:
+    """Réponse get_all synthétique pour le banc d'essai hors ligne."""
+    return {
+        "sensors": [
+            {
+                "sensor_number": str(num),
+                "sensor_index": str(100 + num),
+                "sensor_name": f"Capteur {num}",
+                "sensor_min": f"{7 + num / 100:.2f}",
+                "sensor_unit": "pH",
+                "sensor_type": "1",
+                "sensor_alarm": "0",
+                "sensor_alarm_min": "6.8",
+                "sensor_alarm_max": "7.8",
+            }
+            for num in range(1, sensors + 1)
+        ],
+        "actions": [
+            {"action_index": str(num), "action_name": f"Action {num}", "status": "0", "mode": "0", "speed": "0"}
+            for num in range(1, actions + 1)
+        ],
+        "devices": [],
+        "system": [{"sys_name": "bench", "sys_volume": "50"}],
+    }
+
+
+def _synthetic_events(sensors: int, count: int) -> list:
+    """Trames capteur successives aux valeurs changeantes."""
+    return [
+        ("sensors_data", {"sensors": [{"sensorNum": str(100 + num % sensors + 1), "value": f"{7 + num % 50 / 100:.2f}"}]})
+        for num in range(count)
+    ]
+
+
+def _retained(build) -> int:
+    """Mémoire (octets) retenue par l'objet que construit `build`."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        return tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+async def bench(path, iterations, sensors, actions):
+    """Mesure les chemins chauds hors ligne : parseur, diff des polls, trames poussées."""
+    if path:
+        snapshots, events = [], []
+        for record in read_capture(path):
+            if record.get("k") == KIND_SNAPSHOT:
+                snapshots.append(record.get("d") or {})
+            elif record.get("k") == KIND_EVENT:
+                events.append((record.get("e"), record.get("d")))
+        if not snapshots:
+            print("❌ La capture ne contient aucune réponse get_all", file=sys.stderr)
+            return 1
+        print(f"⏱️  Banc d'essai sur {path} : {len(snapshots)} réponse(s), {len(events)} trame(s)")
+    else:
+        snapshots = [_synthetic_payload(sensors, actions)]
+        events = _synthetic_events(sensors, iterations)
+        print(f"⏱️  Banc d'essai synthétique : {sensors} capteur(s), {actions} action(s)")
+
+    api = SwimoAPI("bench", "bench")
+
+    start = time.perf_counter()
+    for num in range(iterations):
+        api.load_snapshot(snapshots[num % len(snapshots)])
+    parse = (time.perf_counter() - start) / iterations
+
+    previous = api.data.records()
+    start = time.perf_counter()
+    for num in range(iterations):
+        current = api.load_snapshot(snapshots[num % len(snapshots)]).records()
+        changed = {key for key, record in current.items() if previous.get(key) != record}
+        changed.update(previous.keys() - current.keys())
+        previous = current
+    diff = (time.perf_counter() - start) / iterations - parse
+
+    api.load_snapshot(snapshots[-1])
+    start = time.perf_counter()
+    for event, data in events:
+        await api.handle_event(event, data)
+        api.pop_changed_records()
+    push = (time.perf_counter() - start) / len(events) if events else 0.0
+    await api.close()
+
+    # Mémoire par contrôleur : réponse brute décodée contre snapshot typé
+    text = json.dumps(snapshots[-1])
+    raw_size = _retained(lambda: json.loads(text))
+    parsed_size = _retained(lambda: SwimoParser().parse_snapshot(json.loads(text)))
+
+    print(f"   get_all parsé       : {parse * 1e6:.1f} µs")
+    print(f"   diff des enregistrements : {max(diff, 0) * 1e6:.1f} µs")
+    if events:
+        print(f"   trame poussée       : {push * 1e6:.1f} µs ({1 / push:.0f} trames/s)")
+    print(f"   trames écartées     : {api.push_dropped or 0}")
+    print(f"   rejets du parseur   : {api.parser_rejected or 0}")
+    print(f"   mémoire get_all brut : {raw_size / 1024:.1f} Kio")
+    print(f"   mémoire snapshot typé: {parsed_size / 1024:.1f} Kio")
+    return 0
+
+
+async def record(email, password, output, duration, poll_interval):
+    """Enregistre les réponses get_all et les événements WebSocket."""
+    api = SwimoAPI(email, password)
+    writer = CaptureWriter(output)
+    api.set_recorder(writer)
+
+    print(f"🎙️  Enregistrement dans {output} pendant {duration} s...")
+
+    try:
+        if not await api.get_all_data():
+            print("   ❌ Aucune donnée get_all, vérifiez vos identifiants")
+            return 1
+
+        if not await api.start_websocket():
+            print("   ⚠️  WebSocket indisponible, seules les réponses get_all seront enregistrées")
+
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            await asyncio.sleep(min(poll_interval, max(deadline - time.monotonic(), 0)))
+            if time.monotonic() < deadline:
+                await api.get_all_data()
+            print(f"   {writer.count} enregistrement(s)", end="\r")
+
+    finally:
+        api.set_recorder(None)
+        await api.close()
+        writer.close()
+
+    print(f"\n   ✅ {writer.count} enregistrement(s) écrit(s) dans {output}")
+    return 0
+
+
+async def replay(path, speed):
+    """Rejoue une capture dans un SwimoAPI hors ligne et mesure le débit."""
+    api = SwimoAPI("replay", "replay")
+    callbacks = 0
+
+    async def count_callback(data):
+        nonlocal callbacks
+        callbacks += 1
+
+    api.register_callback(count_callback)
+
+    print(f"▶️  Rejeu de {path} (vitesse {speed or 'max'})...")
+    stats = await CaptureReplayer(api, speed=speed).run(path)
+    await api.close()
+
+    print(f"   Réponses get_all : {stats['snapshots']}")
+    print(f"   Événements       : {stats['events']} ({callbacks} callback(s))")
+    print(f"   Trames écartées  : {api.push_dropped or 0}")
+    print(f"   Durée capturée   : {stats['capture_duration']} s")
+    print(f"   Durée du rejeu   : {stats['duration']} s")
+    print(f"   Débit            : {stats['frames_per_second']} trames/s")
+    print(f"   Capteurs         : {len(api.get_sensors())}, actions : {len(api.get_actions())}")
+    return 0
+
+
+def _open_fds():
+    """Nombre de descripteurs ouverts (Linux), None ailleurs."""
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+async def reload_bench(email, password, cycles, websocket, max_growth=256):
+    """Enchaîne des cycles démarrage/arrêt du client et mesure tâches, sockets et mémoire.
+
+    Seul le client SwimoAPI est recréé : le coordinateur et les plateformes
+    de l'entrée Home Assistant ne sont pas couverts. `max_growth` est la
+    croissance mémoire tolérée (Kio) entre le second et le dernier cycle.
+    """
+    print(f"🔁 {cycles} cycle(s) ouverture/fermeture (WebSocket {'oui' if websocket else 'non'})...")
+    tracemalloc.start()
+    samples = []
+
+    for cycle in range(cycles):
+        api = SwimoAPI(email, password)
+
+        async def noop(data):
+            pass
+
+        await api.get_all_data()
+        if websocket:
+            api.create_background_task(api.start_websocket(callback=noop))
+            await asyncio.sleep(1)
+
+        start = time.monotonic()
+        await api.close()
+        close_duration = time.monotonic() - start
+        await asyncio.sleep(0.1)
+
+        samples.append({
+            "tasks": len(asyncio.all_tasks()),
+            "fds": _open_fds(),
+            "memory": tracemalloc.get_traced_memory()[0],
+            "close": close_duration,
+        })
+        print(f"   cycle {cycle + 1}: {samples[-1]['tasks']} tâche(s), "
+              f"{samples[-1]['fds']} fd, {samples[-1]['memory'] / 1024:.0f} Kio, "
+              f"fermeture {close_duration * 1000:.0f} ms")
+
+    tracemalloc.stop()
+    if len(samples) < 2:
+        return 0
+
+    # Le premier cycle initialise les caches (DNS, SSL) : la croissance se mesure à partir du second
+    first, last = samples[1], samples[-1]
+    print()
+    print(f"   Tâches     : {first['tasks']} -> {last['tasks']}")
+    print(f"   Descripteurs: {first['fds']} -> {last['fds']}")
+    print(f"   Mémoire    : {first['memory'] / 1024:.0f} -> {last['memory'] / 1024:.0f} Kio")
+    print(f"   Fermeture max : {max(s['close'] for s in samples) * 1000:.0f} ms")
+    growth = (last["memory"] - first["memory"]) / 1024
+    if growth > max_growth:
+        print(f"   ❌ Croissance mémoire de {growth:.0f} Kio (seuil {max_growth} Kio)")
+        return 1
+    if last["tasks"] > first["tasks"] or (first["fds"] is not None and last["fds"] > first["fds"]):
+        print("   ❌ Croissance détectée")
+        return 1
+    print("   ✅ Pas de croissance des tâches, des sockets ni de la mémoire")
+    return 0
+
+
+def credentials(args):
+    """Identifiants des arguments ou de l'environnement."""
+    email = args.email or os.environ.get("SWIMO_EMAIL")
+    password = args.password or os.environ.get("SWIMO_PASSWORD")
+    if not email or not password:
+        sys.exit("❌ Identifiants requis : --email/--password ou SWIMO_EMAIL/SWIMO_PASSWORD")
+    return email, password
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="pyswimo", description="Client Swimo en ligne de commande")
+    parser.add_argument("--email")
+    parser.add_argument("--password")
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+
+    watch_parser = subparsers.add_parser("watch", help="Suit les changements")
+    watch_parser.add_argument("--poll", type=float, default=30, help="Intervalle get_all (s)")
+    watch_parser.add_argument("--no-websocket", action="store_true")
+    watch_parser.add_argument("--json", action="store_true", help="Une ligne JSON par changement")
+
+    get_parser = subparsers.add_parser("get", help="Affiche le snapshot courant")
+    get_parser.add_argument("--kind", choices=["sensor", "device", "action", "alarm", "system"])
+    get_parser.add_argument("--json", action="store_true")
+    get_parser.add_argument("--raw", action="store_true", help="Réponse get_all brute")
+
+    set_parser = subparsers.add_parser("set", help="Envoie une commande")
+    set_parser.add_argument("key", choices=["device_mode", "action_mode", "device_setpoint"])
+    set_parser.add_argument("number")
+    set_parser.add_argument("value")
+
+    bench_parser = subparsers.add_parser("bench", help="Mesure les chemins chauds hors ligne")
+    bench_parser.add_argument("path", nargs="?", help="Capture à utiliser (synthétique sinon)")
+    bench_parser.add_argument("-n", "--iterations", type=int, default=1000)
+    bench_parser.add_argument("--sensors", type=int, default=12)
+    bench_parser.add_argument("--actions", type=int, default=8)
+
+    record_parser = subparsers.add_parser("record", help="Enregistre une capture")
+    record_parser.add_argument("-o", "--output", default="swimo_capture.jsonl.gz")
+    record_parser.add_argument("-d", "--duration", type=float, default=600)
+    record_parser.add_argument("--poll", type=float, default=30, help="Intervalle get_all (s)")
+
+    replay_parser = subparsers.add_parser("replay", help="Rejoue une capture")
+    replay_parser.add_argument("path")
+    replay_parser.add_argument("--speed", type=float, default=1.0)
+
+    reload_parser = subparsers.add_parser("reload", help="Mesure les fuites sur des cycles ouverture/fermeture du client")
+    reload_parser.add_argument("--cycles", type=int, default=20)
+    reload_parser.add_argument("--no-websocket", action="store_true")
+    reload_parser.add_argument("--max-growth", type=int, default=256, help="Croissance mémoire tolérée (Kio)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.mode == "replay":
+        sys.exit(asyncio.run(replay(args.path, args.speed)))
+    if args.mode == "bench":
+        sys.exit(asyncio.run(bench(args.path, args.iterations, args.sensors, args.actions)))
+
+    email, password = credentials(args)
+    try:
+        if args.mode == "watch":
+            code = asyncio.run(watch(email, password, args.poll, not args.no_websocket, args.json))
+        elif args.mode == "get":
+            code = asyncio.run(get(email, password, args.kind, args.json, args.raw))
+        elif args.mode == "set":
+            code = asyncio.run(set_value(email, password, args.key, args.number, args.value))
+        elif args.mode == "record":
+            code = asyncio.run(record(email, password, args.output, args.duration, args.poll))
+        else:
+            code = asyncio.run(reload_bench(email, password, args.cycles, not args.no_websocket,
+                                           args.max_growth))
+    except KeyboardInterrupt:
+        code = 0
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# ============================================================================
+# scheduler.py - Répartition des interrogations entre entrées
+# ============================================================================
+"""Planification partagée des entrées Swimo.
+
+Avec plusieurs piscines configurées, toutes les entrées démarrent en même
+temps au lancement de Home Assistant : sans décalage, leurs interrogations
+get_all et leurs connexions WebSocket partent ensemble à chaque période.
+Chaque entrée reçoit ici un décalage déterministe (dérivé de son
+identifiant, donc stable d'un redémarrage à l'autre) et toutes les
+requêtes partagent une limite de concurrence.
+"""
+import asyncio
+import hashlib
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SwimoScheduler:
+    """Décalages par entrée et limite globale de requêtes simultanées."""
+
+    def __init__(self, max_concurrent: int):
+        self._default = max_concurrent
+        self._limits = {}
+        self.max_concurrent = max_concurrent
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    def set_limit(self, entry_id: str, max_concurrent: int = None):
+        """Limite demandée par une entrée (None la retire), la plus basse s'applique.
+
+        Les requêtes en cours terminent sous l'ancienne limite, les suivantes
+        attendent la nouvelle.
+        """
+        if max_concurrent is None:
+            self._limits.pop(entry_id, None)
+        else:
+            self._limits[entry_id] = max_concurrent
+        limit = min(self._limits.values(), default=self._default)
+        if limit != self.max_concurrent:
+            _LOGGER.debug(f"Requêtes Swimo simultanées : {self.max_concurrent} -> {limit}")
+            self.max_concurrent = limit
+            self._semaphore = asyncio.Semaphore(limit)
+
+    @staticmethod
+    def jitter(entry_id: str, salt: str = "") -> float:
+        """Fraction déterministe dans [0, 1) propre à une entrée."""
+        digest = hashlib.sha256(f"{entry_id}:{salt}".encode()).digest()
+        return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+    def poll_offset(self, entry_id: str, interval: float) -> float:
+        """Décalage (secondes) de la première interrogation périodique."""
+        return round(self.jitter(entry_id, "poll") * interval, 3)
+
+    def start_delay(self, entry_id: str, base: float, spread: float) -> float:
+        """Délai (secondes) avant la connexion WebSocket d'une entrée."""
+        return round(base + self.jitter(entry_id, "websocket") * spread, 3)
+
+    def limit(self):
+        """Contexte limitant le nombre de requêtes simultanées, toutes entrées confondues."""
+        return self._semaphore
@@ -4,13 +4,18 @@
 
 from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from homeassistant.const import UnitOfTemperature
+from homeassistant.helpers.event import async_call_later
+from homeassistant.const import UnitOfEnergy, UnitOfTemperature
 import logging
+import time
 
-from .const import DOMAIN
+from .pyswimo import SYSTEM_KEY
+from .const import DERIVED_METRICS, DOMAIN, RUNTIME_METRICS
+from .derived import sensor_kind
+from .entity import SwimoEntity
+from .filters import SignificantChangeFilter
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,18 +31,27 @@ async def async_setup_entry(
     entities = []
     
     # Capteurs de mesure
-    sensors = coordinator.data.get("sensors", [])
+    sensors = list(coordinator.data.sensors.values())
     _LOGGER.info(f"Création de {len(sensors)} capteurs")
     
     for sensor in sensors:
-        sensor_num = sensor.get("sensor_number")
-        if sensor_num:
-            entities.append(SwimoSensor(coordinator, sensor, entry.entry_id))
-            _LOGGER.debug(f"Capteur créé: {sensor.get('sensor_name')} (#{sensor_num})")
+        entities.append(SwimoSensor(coordinator, sensor, entry.entry_id))
+        _LOGGER.debug(f"Capteur créé: {sensor.name} (#{sensor.number})")
+    
+    # Grandeurs dérivées calculables avec les sondes présentes
+    kinds = {sensor_kind(sensor) for sensor in sensors}
+    for metric in coordinator.derived.available(kinds):
+        entities.append(SwimoDerivedSensor(coordinator, metric, entry.entry_id))
+    
+    # Compteurs de fonctionnement des actions (énergie si une courbe de puissance est configurée)
+    for action in coordinator.data.actions.values():
+        for metric in RUNTIME_METRICS:
+            if metric == "energy" and not coordinator.runtime.has_curve(action.key):
+                continue
+            entities.append(SwimoRuntimeSensor(coordinator, action, metric, entry.entry_id))
     
     # Capteurs système
-    system = coordinator.data.get("system", [])
-    if system and len(system) > 0:
+    if coordinator.data.system:
         entities.append(SwimoSystemSensor(coordinator, "sys_volume", "Volume piscine", "m³", entry.entry_id))
         entities.append(SwimoSystemSensor(coordinator, "sys_name", "Modèle", "", entry.entry_id))
     
@@ -45,20 +59,29 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class SwimoSensor(CoordinatorEntity, SensorEntity):
+class SwimoSensor(SwimoEntity, SensorEntity):
     """Capteur de mesure Swimo."""
     
     def __init__(self, coordinator, sensor_data, entry_id):
-        super().__init__(coordinator)
-        self._sensor_data = sensor_data
-        self._sensor_num = sensor_data.get("sensor_number")
+        self._record_key = sensor_data.key
+        super().__init__(coordinator, context=self._record_key)
+        self._api = coordinator.api
+        self._sensor_num = sensor_data.number
         self._entry_id = entry_id
+        self._attrs = {}
+        self._attrs_version = None
+        self._kind = sensor_kind(sensor_data)
+        self._filter_scale = coordinator.deadband_scale
+        self._filter = SignificantChangeFilter.for_kind(self._kind, self._filter_scale)
+        self._written_attrs = None
+        self._written_available = None
+        self._cancel_deferred = None
         
-        self._attr_name = f"Swimo {sensor_data.get('sensor_name', f'Capteur {self._sensor_num}')}"
+        self._attr_name = f"Swimo {sensor_data.name or f'Capteur {self._sensor_num}'}"
         self._attr_unique_id = f"swimo_{entry_id}_sensor_{self._sensor_num}"
         
         # Icône selon le type de capteur
-        sensor_hash = sensor_data.get("sensor_hash", "")
+        sensor_hash = sensor_data.hash
         if "PH" in sensor_hash:
             self._attr_icon = "mdi:ph"
         elif "TEMP" in sensor_hash:
@@ -74,7 +97,7 @@ class SwimoSensor(CoordinatorEntity, SensorEntity):
             self._attr_icon = "mdi:gauge"
         
         # Unité de mesure
-        self._attr_native_unit_of_measurement = sensor_data.get("sensor_unit")
+        self._attr_native_unit_of_measurement = sensor_data.unit
         if self._attr_native_unit_of_measurement == "°C":
             self._attr_device_class = SensorDeviceClass.TEMPERATURE
             self._attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
@@ -84,54 +107,102 @@ class SwimoSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Valeur du capteur."""
-        sensors = self.coordinator.data.get("sensors", [])
-        for sensor in sensors:
-            if sensor.get("sensor_number") == self._sensor_num:
-                # Utiliser sensor_min qui contient la valeur actuelle
-                value = sensor.get("sensor_min") or sensor.get("sensor_max")
-                if value is not None and value != "":
-                    try:
-                        return float(value)
-                    except (ValueError, TypeError):
-                        return value
+        sensor = self.coordinator.get_record(self._record_key)
+        if sensor:
+            return sensor.value if sensor.value is not None else sensor.value_text
         return None
     
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """N'écrit l'état que sur un changement significatif."""
+        if self._filter_scale != self.coordinator.deadband_scale:
+            # Options modifiées : nouveau filtre, la valeur courante est réécrite
+            self._filter_scale = self.coordinator.deadband_scale
+            self._filter = SignificantChangeFilter.for_kind(self._kind, self._filter_scale)
+        available = self.available
+        # La valeur brute suit la mesure : elle ne justifie pas une écriture à elle seule
+        attrs = {k: v for k, v in self.extra_state_attributes.items() if k != "raw_value"}
+        value = self.native_value
+        now = time.monotonic()
+        value_changed = self._filter.accept(value, now)
+        if value_changed or attrs != self._written_attrs or available != self._written_available:
+            if not value_changed:
+                # La valeur écrite avec les attributs devient la référence du filtre
+                self._filter.reset()
+                self._filter.accept(value, now)
+            self._written_attrs = attrs
+            self._written_available = available
+            self.async_write_ha_state()
+        self._schedule_deferred(value, now)
+    
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self._unschedule_deferred)
+    
+    def _schedule_deferred(self, value, now: float) -> None:
+        """Réévalue la valeur retenue (délai minimal) ou le battement de cœur à échéance."""
+        self._unschedule_deferred()
+        delay = self._filter.retry_in(value, now)
+        if delay is not None:
+            self._cancel_deferred = async_call_later(self.hass, delay, self._deferred_update)
+    
+    @callback
+    def _unschedule_deferred(self) -> None:
+        if self._cancel_deferred is not None:
+            self._cancel_deferred()
+            self._cancel_deferred = None
+    
+    @callback
+    def _deferred_update(self, _now) -> None:
+        self._cancel_deferred = None
+        self._handle_coordinator_update()
+    
     @property
     def extra_state_attributes(self):
-        """Attributs supplémentaires."""
-        sensors = self.coordinator.data.get("sensors", [])
-        for sensor in sensors:
-            if sensor.get("sensor_number") == self._sensor_num:
-                attrs = {
-                    "sensor_status": sensor.get("sensor_status"),
-                    "sensor_alarm": sensor.get("sensor_alarm") == "1",
-                }
-                
-                if "sensor_raw_sensor" in sensor:
-                    attrs["raw_value"] = sensor["sensor_raw_sensor"]
-                
-                if "sensor_text" in sensor:
-                    attrs["status_text"] = sensor["sensor_text"].strip()
-                
-                # Limites
-                if sensor.get("sensor_alarm_min"):
-                    attrs["alarm_min"] = sensor["sensor_alarm_min"]
-                if sensor.get("sensor_alarm_max"):
-                    attrs["alarm_max"] = sensor["sensor_alarm_max"]
-                
-                # Connexion WebSocket
-                api = self.hass.data[DOMAIN][self._entry_id]["api"]
-                attrs["websocket_connected"] = api.is_websocket_connected()
-                
-                return attrs
-        return {}
+        """Attributs supplémentaires, reconstruits seulement si l'enregistrement ou le WebSocket change."""
+        version = (self.coordinator.record_version(self._record_key), self._api.is_websocket_connected())
+        if version != self._attrs_version:
+            self._attrs = self._build_attributes()
+            self._attrs_version = version
+        return self._attrs
+    
+    def _build_attributes(self):
+        """Construit les attributs supplémentaires."""
+        sensor = self.coordinator.get_record(self._record_key)
+        if not sensor:
+            return {}
+        
+        attrs = {
+            "sensor_status": sensor.status,
+            "sensor_alarm": sensor.alarm,
+        }
+        
+        if sensor.raw_value is not None:
+            attrs["raw_value"] = sensor.raw_value
+        
+        if sensor.text is not None:
+            attrs["status_text"] = sensor.text
+        
+        # Limites
+        if sensor.alarm_min is not None:
+            attrs["alarm_min"] = sensor.alarm_min
+        if sensor.alarm_max is not None:
+            attrs["alarm_max"] = sensor.alarm_max
+        
+        # Connexion WebSocket
+        attrs["websocket_connected"] = self._api.is_websocket_connected()
+        
+        return attrs
 
 
-class SwimoSystemSensor(CoordinatorEntity, SensorEntity):
+class SwimoSystemSensor(SwimoEntity, SensorEntity):
     """Capteur d'information système."""
     
+    # Champ de SystemRecord pour chaque clé historique (conservée dans l'unique_id)
+    FIELDS = {"sys_volume": "volume", "sys_name": "name"}
+    
     def __init__(self, coordinator, key, name, unit, entry_id):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=SYSTEM_KEY)
         self._key = key
         self._attr_name = f"Swimo {name}"
         self._attr_unique_id = f"swimo_{entry_id}_system_{key}"
@@ -141,7 +212,55 @@ class SwimoSystemSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Valeur du capteur système."""
-        system = self.coordinator.data.get("system", [])
-        if system and len(system) > 0:
-            return system[0].get(self._key)
-        return None
\ No newline at end of file
+        system = self.coordinator.data.system
+        if system:
+            return getattr(system, self.FIELDS[self._key])
+        return None
+
+
+class SwimoDerivedSensor(SwimoEntity, SensorEntity):
+    """Grandeur dérivée (LSI, chlore estimé, tendances) calculée localement."""
+    
+    def __init__(self, coordinator, metric, entry_id):
+        super().__init__(coordinator, context=("derived", metric))
+        self._metric = metric
+        info = DERIVED_METRICS[metric]
+        self._attr_name = f"Swimo {info['name']}"
+        self._attr_unique_id = f"swimo_{entry_id}_derived_{metric}"
+        self._attr_native_unit_of_measurement = info["unit"]
+        self._attr_icon = info["icon"]
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+    
+    @property
+    def native_value(self):
+        """Valeur calculée."""
+        return self.coordinator.derived.values.get(self._metric)
+
+
+class SwimoRuntimeSensor(SwimoEntity, SensorEntity):
+    """Compteur de fonctionnement ou d'énergie d'une action."""
+    
+    def __init__(self, coordinator, action_data, metric, entry_id):
+        self._action_num = action_data.number
+        super().__init__(coordinator, context=("runtime", self._action_num))
+        self._action_key = action_data.key
+        self._metric = metric
+        info = RUNTIME_METRICS[metric]
+        
+        action_name = action_data.name or f"Action {self._action_num}"
+        self._attr_name = f"Swimo {action_name} {info['name']}"
+        self._attr_unique_id = f"swimo_{entry_id}_action_{self._action_num}_{metric}"
+        self._attr_native_unit_of_measurement = info["unit"]
+        self._attr_icon = info["icon"]
+        # Les compteurs du jour retombent à zéro à minuit, ce que TOTAL_INCREASING admet
+        self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+        if metric == "energy":
+            self._attr_device_class = SensorDeviceClass.ENERGY
+            self._attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+        elif metric.startswith("runtime"):
+            self._attr_device_class = SensorDeviceClass.DURATION
+    
+    @property
+    def native_value(self):
+        """Valeur du compteur."""
+        return self.coordinator.runtime.value(self._action_key, self._metric)
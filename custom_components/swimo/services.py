@@ -0,0 +1,248 @@
+# ============================================================================
+# services.py - Services Swimo
+# ============================================================================
+"""Services de l'intégration Swimo."""
+import asyncio
+import logging
+import time
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+import voluptuous as vol
+
+from .pyswimo import COMMAND_FIELDS, CaptureReplayer, SwimoData, check_change, read_capture
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_APPLY = "apply"
+SERVICE_PROFILE = "profile"
+SERVICE_REPLAY = "replay"
+SERVICE_HISTORY = "history"
+HISTORY_MAX_BUCKETS = 1000
+
+CHANGE_SCHEMA = vol.Schema({
+    vol.Required("key"): vol.In(list(COMMAND_FIELDS)),
+    vol.Required("value"): vol.Any(cv.string, vol.Coerce(float)),
+    vol.Required("number"): vol.Any(int, cv.string),
+})
+
+APPLY_SCHEMA = vol.Schema({
+    vol.Optional("config_entry_id"): cv.string,
+    vol.Required("changes"): vol.All(cv.ensure_list, [CHANGE_SCHEMA]),
+})
+
+PROFILE_SCHEMA = vol.Schema({
+    vol.Optional("duration", default=30): vol.All(vol.Coerce(int), vol.Range(min=1, max=600)),
+    vol.Optional("top", default=25): vol.All(vol.Coerce(int), vol.Range(min=5, max=200)),
+})
+
+REPLAY_SCHEMA = vol.Schema({
+    vol.Optional("config_entry_id"): cv.string,
+    vol.Required("path"): cv.string,
+    vol.Optional("speed", default=0): vol.All(vol.Coerce(float), vol.Range(min=0, max=1000)),
+})
+
+
+HISTORY_SCHEMA = vol.Schema({
+    vol.Optional("config_entry_id"): cv.string,
+    vol.Required("sensor_number"): vol.Any(int, cv.string),
+    vol.Optional("period", default=3600): vol.All(vol.Coerce(int), vol.Range(min=60, max=7 * 86400)),
+    vol.Optional("bucket", default=0): vol.All(vol.Coerce(int), vol.Range(min=0, max=86400)),
+})
+
+
+def _entry_id(hass: HomeAssistant, call: ServiceCall) -> str:
+    """Identifiant de l'entrée visée par un appel de service."""
+    entries = [
+        entry_id for entry_id, data in hass.data.get(DOMAIN, {}).items()
+        if isinstance(data, dict) and "coordinator" in data
+    ]
+    entry_id = call.data.get("config_entry_id")
+    if entry_id:
+        if entry_id not in entries:
+            raise ServiceValidationError(f"Entrée Swimo inconnue: {entry_id}")
+        return entry_id
+    if len(entries) != 1:
+        raise ServiceValidationError("Précisez config_entry_id : plusieurs (ou aucune) entrées Swimo")
+    return entries[0]
+
+
+def _entry_data(hass: HomeAssistant, call: ServiceCall) -> dict:
+    """Données de l'entrée visée par un appel de service."""
+    return hass.data[DOMAIN][_entry_id(hass, call)]
+
+
+def _iso(timestamp: float) -> str:
+    """Horodatage Unix en date ISO (UTC)."""
+    return dt_util.utc_from_timestamp(timestamp).isoformat()
+
+
+def validate_change(data: SwimoData, change: dict) -> None:
+    """Vérifie une commande contre le snapshot courant."""
+    try:
+        check_change(data, change)
+    except ValueError as e:
+        raise ServiceValidationError(str(e)) from e
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Enregistre les services Swimo."""
+
+    async def apply(call: ServiceCall):
+        """Applique une série de changements puis rafraîchit une seule fois."""
+        entry_data = _entry_data(hass, call)
+        coordinator = entry_data["coordinator"]
+        changes = call.data["changes"]
+
+        for change in changes:
+            validate_change(coordinator.data or SwimoData(), change)
+
+        results = await entry_data["api"].apply_changes(changes)
+        _LOGGER.info(f"swimo.apply : {results}")
+        await coordinator.async_request_refresh()
+        return results
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_APPLY,
+        apply,
+        schema=APPLY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def profile(call: ServiceCall):
+        """Profile la boucle pendant `duration` secondes et écrit un rapport dans la configuration."""
+        from .profiler import SwimoProfiler
+
+        domain_data = hass.data.setdefault(DOMAIN, {})
+        if domain_data.get("_profiler") is not None:
+            raise ServiceValidationError("Un profilage Swimo est déjà en cours")
+
+        profiler = SwimoProfiler()
+        try:
+            profiler.start()
+        except ValueError as e:
+            raise ServiceValidationError(f"Profilage impossible : {e}") from e
+        domain_data["_profiler"] = profiler
+        _LOGGER.info(f"swimo.profile : profilage pendant {call.data['duration']} s")
+        try:
+            await asyncio.sleep(call.data["duration"])
+        finally:
+            profiler.stop()
+            domain_data.pop("_profiler", None)
+
+        path = hass.config.path(f"swimo_profile_{dt_util.now():%Y%m%d_%H%M%S}.txt")
+        summary = await hass.async_add_executor_job(profiler.write_report, path, call.data["top"])
+        _LOGGER.info(f"swimo.profile : rapport écrit dans {path}")
+        return {"path": path, **summary}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def replay(call: ServiceCall):
+        """Rejoue une capture dans l'entrée chargée et mesure les écritures d'état de ses entités."""
+        entry_id = _entry_id(hass, call)
+        entry_data = hass.data[DOMAIN][entry_id]
+        api = entry_data["api"]
+        coordinator = entry_data["coordinator"]
+
+        path = call.data["path"]
+        if not path.startswith("/"):
+            path = hass.config.path(path)
+        if not hass.config.is_allowed_path(path):
+            raise ServiceValidationError(f"Chemin non autorisé : {path}")
+        if coordinator.replaying:
+            raise ServiceValidationError("Un rejeu est déjà en cours pour cette entrée")
+        try:
+            records = await hass.async_add_executor_job(lambda: list(read_capture(path)))
+        except (OSError, ValueError) as e:
+            raise ServiceValidationError(f"Capture illisible : {e}") from e
+
+        entity_ids = {
+            entity.entity_id for entity in er.async_entries_for_config_entry(er.async_get(hass), entry_id)
+        }
+        writes = 0
+
+        @callback
+        def count_write(event):
+            nonlocal writes
+            if event.data.get("entity_id") in entity_ids:
+                writes += 1
+
+        # Les trames rejouées passent par le coordinateur même si le WebSocket est désactivé
+        async def push_callback(data):
+            coordinator.async_update_records(api.pop_changed_records())
+
+        # Ni alarmes, ni compteurs persistés, ni filtration, ni MQTT pendant le rejeu
+        coordinator.replaying = True
+        unsubscribe = hass.bus.async_listen(EVENT_STATE_CHANGED, count_write)
+        api.register_callback(push_callback)
+        try:
+            stats = await CaptureReplayer(
+                api, speed=call.data["speed"], on_snapshot=coordinator.async_set_updated_data,
+            ).run_records(records)
+        finally:
+            api.unregister_callback(push_callback)
+            unsubscribe()
+            coordinator.replaying = False
+        # Les données réelles remplacent aussitôt celles de la capture
+        await coordinator.async_request_refresh()
+
+        stats["state_writes"] = writes
+        stats["state_writes_per_second"] = round(writes / stats["duration"], 1) if stats["duration"] > 0 else 0.0
+        _LOGGER.info(f"swimo.replay : {stats}")
+        return stats
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REPLAY,
+        replay,
+        schema=REPLAY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def history(call: ServiceCall):
+        """Historique en mémoire d'un capteur : points bruts, ou série agrégée si `bucket`."""
+        coordinator = _entry_data(hass, call)["coordinator"]
+        number = str(call.data["sensor_number"])
+        sensor = coordinator.data.sensors.get(number) if coordinator.data else None
+        if sensor is None:
+            raise ServiceValidationError(f"Capteur inconnu : {number}")
+        period, bucket = call.data["period"], call.data["bucket"]
+        if bucket and period / bucket > HISTORY_MAX_BUCKETS:
+            raise ServiceValidationError(f"Au plus {HISTORY_MAX_BUCKETS} intervalles par appel")
+
+        until = time.time()
+        since = until - period
+        buffer = coordinator.get_history(number)
+        response = {"sensor_number": number, "name": sensor.name, "unit": sensor.unit}
+        if bucket:
+            response["series"] = [
+                {"start": _iso(start), "min": low, "max": high, "mean": round(mean, 4), "count": count}
+                for start, low, high, mean, count in (buffer.downsample(bucket, until, since) if buffer else [])
+            ]
+        else:
+            response["points"] = [
+                {"time": _iso(timestamp), "value": value}
+                for timestamp, value in (buffer.points(since) if buffer else [])
+            ]
+        return response
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_HISTORY,
+        history,
+        schema=HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
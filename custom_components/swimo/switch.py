@@ -6,10 +6,10 @@ from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 import logging
 
 from .const import DOMAIN, DEVICE_TYPES
+from .entity import SwimoEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,49 +25,37 @@ async def async_setup_entry(
     entities = []
     
     # Appareils contrôlables
-    devices = coordinator.data.get("devices", [])
-    for device in devices:
-        device_num = device.get("device_index")
-        if device_num:
-            entities.append(SwimoSwitch(coordinator, api, device, entry.entry_id))
+    for device in coordinator.data.devices.values():
+        entities.append(SwimoSwitch(coordinator, api, device, entry.entry_id))
     
     # Actions contrôlables
-    actions = coordinator.data.get("actions", [])
-    for action in actions:
-        action_num = action.get("action_index") or action.get("actionNum")
-        if action_num:
-            entities.append(SwimoActionSwitch(coordinator, api, action, entry.entry_id))
+    for action in coordinator.data.actions.values():
+        entities.append(SwimoActionSwitch(coordinator, api, action, entry.entry_id))
     
     async_add_entities(entities)
 
 
-class SwimoSwitch(CoordinatorEntity, SwitchEntity):
+class SwimoSwitch(SwimoEntity, SwitchEntity):
     """Switch pour contrôler les équipements."""
     
     def __init__(self, coordinator, api, device_data, entry_id):
-        super().__init__(coordinator)
+        self._record_key = device_data.key
+        super().__init__(coordinator, context=self._record_key)
         self._api = api
-        self._device_data = device_data
-        self._device_num = device_data.get("device_index")
+        self._device_num = device_data.number
         self._entry_id = entry_id
         
-        self._attr_name = device_data.get("device_name", f"Appareil {self._device_num}")
+        self._attr_name = device_data.name or f"Appareil {self._device_num}"
         self._attr_unique_id = f"swimo_{entry_id}_device_{self._device_num}"
         
-        device_type = device_data.get("device_type", "").lower()
-        device_info = DEVICE_TYPES.get(device_type, {})
+        device_info = DEVICE_TYPES.get(device_data.type, {})
         self._attr_icon = device_info.get("icon", "mdi:power")
     
     @property
     def is_on(self):
         """État du switch."""
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if device.get("device_index") == self._device_num:
-                mode = device.get("device_mode", 0)
-                status = device.get("device_status", 0)
-                return mode == 1 or status == 1
-        return False
+        device = self.coordinator.get_record(self._record_key)
+        return bool(device) and (device.mode == 1 or device.status == 1)
     
     async def async_turn_on(self, **kwargs):
         """Allumer l'équipement."""
@@ -90,31 +78,25 @@ class SwimoSwitch(CoordinatorEntity, SwitchEntity):
             await self.coordinator.async_request_refresh()
 
 
-class SwimoActionSwitch(CoordinatorEntity, SwitchEntity):
+class SwimoActionSwitch(SwimoEntity, SwitchEntity):
     """Switch pour contrôler les actions."""
     
     def __init__(self, coordinator, api, action_data, entry_id):
-        super().__init__(coordinator)
+        self._record_key = action_data.key
+        super().__init__(coordinator, context=self._record_key)
         self._api = api
-        self._action_data = action_data
-        self._action_num = action_data.get("action_index") or action_data.get("actionNum")
+        self._action_num = action_data.number
         self._entry_id = entry_id
         
-        self._attr_name = action_data.get("action_name", f"Action {self._action_num}")
+        self._attr_name = action_data.name or f"Action {self._action_num}"
         self._attr_unique_id = f"swimo_{entry_id}_action_{self._action_num}"
         self._attr_icon = "mdi:play-circle"
     
     @property
     def is_on(self):
         """État de l'action."""
-        actions = self.coordinator.data.get("actions", [])
-        for action in actions:
-            action_num = action.get("action_index") or action.get("actionNum")
-            if action_num == self._action_num:
-                status = action.get("status", 0)
-                mode = action.get("mode", 0)
-                return status == 1 or mode == 1
-        return False
+        action = self.coordinator.get_record(self._record_key)
+        return bool(action) and (action.status == 1 or action.mode == 1)
     
     async def async_turn_on(self, **kwargs):
         """Activer l'action."""